@@ -0,0 +1,99 @@
+const fs = require("fs");
+const path = require("path");
+const vm = require("vm");
+
+const STATIC_DIRECTORY = path.join(__dirname, "..", "interactive_widgets_mkdocs", "static");
+const MIN_SECONDS = Number(process.env.BENCHMARK_MIN_SECONDS || 0.5);
+
+globalThis.window = {
+  requestAnimationFrame: callback => setImmediate(callback),
+  setTimeout: setTimeout,
+};
+
+for (const file of ["Widget.js", "RoomConnection.js", "TextViewerWidget.js", "ImageViewerWidget.js", "MonitorMultiplexer.js"]) {
+  vm.runInThisContext(fs.readFileSync(path.join(STATIC_DIRECTORY, file), "utf8"), { filename: file });
+}
+const { Widget, RoomConnection, TextViewerWidget, ImageViewerWidget, MonitorMultiplexer } = vm.runInThisContext(
+  "({ Widget, RoomConnection, TextViewerWidget, ImageViewerWidget, MonitorMultiplexer })",
+);
+
+function benchmark(name, bytes, run) {
+  for (let iteration = 0; iteration < 10; iteration++) {
+    run();
+  }
+  let iterations = 0;
+  const started = process.hrtime.bigint();
+  let elapsed = 0;
+  while (elapsed < MIN_SECONDS) {
+    for (let batch = 0; batch < 10; batch++) {
+      run();
+    }
+    iterations += 10;
+    elapsed = Number(process.hrtime.bigint() - started) / 1e9;
+  }
+  return [name, {
+    iterations: iterations,
+    seconds: elapsed,
+    ops_per_second: iterations / elapsed,
+    bytes_per_second: bytes * iterations / elapsed,
+  }];
+}
+
+function makeText(length) {
+  const line = "def example(value):  # ünïcödé\n    return value * 2\n";
+  return line.repeat(Math.ceil(length / line.length)).slice(0, length);
+}
+
+const text = makeText(64 * 1024);
+const textBytes = new TextEncoder().encode(text);
+const widget = new Widget();
+const base64 = widget.btoa(text);
+
+const roomConnection = new RoomConnection("benchmark", {
+  protocols: [BINARY_PROTOCOL],
+  executors: ["executor"],
+});
+roomConnection.addEventListener("executor", () => {});
+const chunk = textBytes.slice(0, 4096);
+const jsonMessage = {
+  data: JSON.stringify({
+    executor: "executor",
+    sequence: 1,
+    message: { type: "output", stdout: roomConnection.encodeBase64(chunk) },
+  }),
+};
+const binaryFrame = new Uint8Array(BINARY_HEADER_LENGTH + chunk.length);
+new DataView(binaryFrame.buffer).setUint32(3, 1);
+binaryFrame.set([0, 0, BINARY_CHANNEL_STDOUT]);
+binaryFrame.set(chunk, BINARY_HEADER_LENGTH);
+const binaryMessage = { data: binaryFrame.buffer };
+
+const contentsLines = new TextEncoder().encode(Array.from(
+  { length: 100 },
+  (_, index) => `${JSON.stringify({ contents: widget.btoa(`line ${index}\n`) })}\n`,
+).join(""));
+const textViewerWidget = new TextViewerWidget(null, "/data/example.py", "python");
+textViewerWidget.setupContents = () => {};
+const imageViewerWidget = new ImageViewerWidget(null, "/data/image.png", "image/png");
+imageViewerWidget.setupContents = () => {};
+
+const multiplexedLines = new TextEncoder().encode(Array.from(
+  { length: 100 },
+  (_, index) => `${JSON.stringify({ widget: `widget-${index % 4}`, contents: widget.btoa(`line ${index}\n`) })}\n`,
+).join(""));
+const monitorMultiplexer = new MonitorMultiplexer(new EventTarget(), "monitor");
+
+const editedText = `${text.slice(0, 30000)}inserted text${text.slice(30010)}`;
+
+const results = Object.fromEntries([
+  benchmark("Widget.atob", base64.length, () => widget.atob(base64)),
+  benchmark("Widget.btoa", textBytes.length, () => widget.btoa(text)),
+  benchmark("Widget.diffText", textBytes.length, () => widget.diffText(text, editedText)),
+  benchmark("RoomConnection.handleMessage json", chunk.length, () => roomConnection.handleMessage(jsonMessage)),
+  benchmark("RoomConnection.handleMessage binary", chunk.length, () => roomConnection.handleMessage(binaryMessage)),
+  benchmark("TextViewerWidget.handleMessage lines", contentsLines.length, () => textViewerWidget.handleMessage({ type: "output", stdout: contentsLines })),
+  benchmark("ImageViewerWidget.handleMessage lines", contentsLines.length, () => imageViewerWidget.handleMessage({ type: "output", stdout: contentsLines })),
+  benchmark("MonitorMultiplexer.handleMessage lines", multiplexedLines.length, () => monitorMultiplexer.handleMessage({ type: "output", stdout: multiplexedLines })),
+]);
+
+process.stdout.write(`${JSON.stringify(results, null, 2)}\n`);
@@ -0,0 +1,71 @@
+import argparse
+import json
+import pathlib
+import sys
+import typing
+
+
+def get_metrics(results: dict) -> typing.Dict[str, typing.Tuple[str, float]]:
+    metrics = {}
+    for hooks in results['hooks']:
+        scenario = f'hooks[pages={hooks["pages"]},widgets_per_page={hooks["widgets_per_page"]},widget_types={"+".join(hooks["widget_types"])}]'
+        for index, build in enumerate(hooks['builds']):
+            for name, seconds in build.items():
+                metrics[f'{scenario}.builds[{index}].{name}'] = (
+                    'seconds', seconds)
+        metrics[f'{scenario}.peak_rss_bytes'] = (
+            'bytes', hooks['peak_rss_bytes'])
+        for name, size in hooks['output_bytes'].items():
+            metrics[f'{scenario}.output_bytes.{name}'] = ('bytes', size)
+    for name, benchmark in (results['client'] or {}).items():
+        metrics[f'client[{name}].ops_per_second'] = (
+            'ops', benchmark['ops_per_second'])
+    return metrics
+
+
+def get_change(kind: str, baseline: float, current: float) -> float:
+    if kind == 'ops':
+        baseline, current = current, baseline
+    if baseline == 0:
+        return 0.0 if current == 0 else float('inf')
+    return current / baseline - 1
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Compare two benchmark results and fail on regressions')
+    parser.add_argument('baseline', type=pathlib.Path)
+    parser.add_argument('current', type=pathlib.Path)
+    parser.add_argument('--time-threshold', type=float, default=0.2,
+                        help='maximum relative slowdown of timings and client throughput')
+    parser.add_argument('--size-threshold', type=float, default=0.05,
+                        help='maximum relative growth of output sizes and peak RSS')
+    parser.add_argument('--min-seconds', type=float, default=0.01,
+                        help='ignore slowdowns smaller than this absolute number of seconds')
+    arguments = parser.parse_args()
+
+    baseline = get_metrics(json.loads(arguments.baseline.read_text()))
+    current = get_metrics(json.loads(arguments.current.read_text()))
+
+    regressions = 0
+    for name in sorted(baseline.keys() & current.keys()):
+        kind, baseline_value = baseline[name]
+        _, current_value = current[name]
+        change = get_change(kind, baseline_value, current_value)
+        threshold = arguments.size_threshold if kind == 'bytes' else arguments.time_threshold
+        regression = change > threshold
+        if kind == 'seconds' and current_value - baseline_value < arguments.min_seconds:
+            regression = False
+        regressions += regression
+        print(f'{"REGRESSION " if regression else ""}{name}: {baseline_value:.6g} -> {current_value:.6g} ({change:+.1%})')
+    for name in sorted(baseline.keys() ^ current.keys()):
+        print(
+            f'{name}: only in {"baseline" if name in baseline else "current"}')
+
+    if regressions > 0:
+        print(f'{regressions} regressions', file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
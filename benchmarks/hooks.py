@@ -0,0 +1,186 @@
+import argparse
+import json
+import pathlib
+import resource
+import sys
+import tempfile
+import time
+import types
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+import mkdocs.plugins  # noqa: E402
+import mkdocs.config.base  # noqa: E402
+import mkdocs.config.config_options  # noqa: E402
+import mkdocs.structure.pages  # noqa: E402
+
+from interactive_widgets_mkdocs.assets import STATIC_DIRECTORY  # noqa: E402
+from interactive_widgets_mkdocs.plugin import Plugin  # noqa: E402
+
+
+WIDGET_TEMPLATES = {
+    'button': '<x-button command="date" image="ubuntu:latest" label="Print date {index}" working-directory="/data" />',
+    'epilogue': '<x-epilogue command="date" image="ubuntu:latest" working-directory="/data" />',
+    'image-viewer': '<x-image-viewer file="/data/image-{index}.png" mime="image/png" />',
+    'prologue': '<x-prologue command="date" image="ubuntu:latest" working-directory="/data" />',
+    'terminal': '<x-terminal image="ubuntu:latest" command="/bin/bash" working-directory="/data" />',
+    'text-editor': '<x-text-editor file="/data/example-{index}.py" mode="python" />',
+    'text-viewer': '<x-text-viewer file="/data/example-{index}.md" mode="markdown" />',
+}
+
+PAGE_TEMPLATE = '''<!DOCTYPE html>
+<html lang="en">
+    <head>
+        <meta charset="utf-8">
+        <meta name="viewport" content="width=device-width, initial-scale=1.0">
+        <title>Page {page} - Benchmark</title>
+        <link href="{root}css/base.css" rel="stylesheet">
+        <script src="{root}js/base.js"></script>
+    </head>
+    <body>
+        <div class="navbar">
+            <ul class="nav">
+{navigation}
+            </ul>
+        </div>
+        <div class="container" role="main">
+            <h1 id="page-{page}">Page {page}</h1>
+{content}
+        </div>
+    </body>
+</html>
+'''
+
+
+class Page:
+
+    def __init__(self, url: str, abs_dest_path: pathlib.Path):
+        self.url = url
+        self.file = types.SimpleNamespace(abs_dest_path=str(abs_dest_path))
+        self.meta = {}
+
+    def __str__(self) -> str:
+        return f'Page(url={repr(self.url)})'
+
+
+def generate_site(pages: int, widgets_per_page: int, widget_types: list) -> list:
+    site = []
+    for page in range(pages):
+        url = f'page-{page}/'
+        root = '../'
+        navigation = '\n'.join(
+            f'                <li><a href="{root}page-{other}/">Page {other}</a></li>'
+            for other in range(min(pages, 50))
+        )
+        content = []
+        for index in range(widgets_per_page):
+            widget_type = widget_types[index % len(widget_types)]
+            content.append(
+                f'            <p>Paragraph {index} of page {page} with some <em>text</em> &amp; <code>code</code> around widgets.</p>')
+            content.append(
+                f'            <p>{WIDGET_TEMPLATES[widget_type].format(index=index)}</p>')
+        site.append((url, PAGE_TEMPLATE.format(
+            page=page,
+            root=root,
+            navigation=navigation,
+            content='\n'.join(content),
+        )))
+    return site
+
+
+def get_size(path: pathlib.Path, pattern: str) -> int:
+    return sum(
+        file.stat().st_size
+        for file in path.glob(pattern)
+        if file.is_file()
+    )
+
+
+def run_build(plugin_config: dict, site: list, directory: pathlib.Path) -> dict:
+    timings = {}
+    started = time.perf_counter()
+
+    plugin = Plugin()
+    errors, _ = plugin.load_config(plugin_config)
+    if len(errors) > 0:
+        raise ValueError(f'Invalid plugin configuration: {errors}')
+    config = {
+        'site_dir': str(directory / 'site'),
+        'config_file_path': str(directory / 'mkdocs.yml'),
+        'strict': False,
+        'use_directory_urls': True,
+    }
+
+    hook_started = time.perf_counter()
+    config = plugin.on_config(config)
+    timings['on_config_seconds'] = time.perf_counter() - hook_started
+
+    hook_started = time.perf_counter()
+    plugin.on_pre_build(config=config)
+    timings['on_pre_build_seconds'] = time.perf_counter() - hook_started
+
+    timings['on_post_page_seconds'] = 0.0
+    for url, output in site:
+        page = Page(url, config['site_dir'] / url / 'index.html')
+        hook_started = time.perf_counter()
+        output = plugin.on_post_page(output, page=page, config=config)
+        timings['on_post_page_seconds'] += time.perf_counter() - hook_started
+        pathlib.Path(page.file.abs_dest_path).parent.mkdir(
+            parents=True, exist_ok=True)
+        pathlib.Path(page.file.abs_dest_path).write_text(output)
+
+    hook_started = time.perf_counter()
+    plugin.on_post_build(config=config)
+    timings['on_post_build_seconds'] = time.perf_counter() - hook_started
+
+    timings['wall_seconds'] = time.perf_counter() - started
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Run the plugin hooks on a synthetic site and print the measurements as JSON')
+    parser.add_argument('--pages', type=int, default=10)
+    parser.add_argument('--widgets-per-page', type=int, default=5)
+    parser.add_argument('--widget-types', nargs='+',
+                        choices=sorted(WIDGET_TEMPLATES.keys()), default=sorted(WIDGET_TEMPLATES.keys()))
+    parser.add_argument('--builds', type=int, default=2,
+                        help='number of consecutive builds, later builds use the build cache of earlier ones')
+    parser.add_argument('--config', type=json.loads, default={},
+                        help='plugin configuration as JSON object')
+    arguments = parser.parse_args()
+
+    if not (STATIC_DIRECTORY / 'node_modules').is_dir():
+        parser.error(
+            f'{STATIC_DIRECTORY / "node_modules"} is missing, run "npm ci --prefix {STATIC_DIRECTORY}" first')
+
+    site = generate_site(
+        arguments.pages, arguments.widgets_per_page, arguments.widget_types)
+    with tempfile.TemporaryDirectory() as directory:
+        directory = pathlib.Path(directory)
+        builds = [
+            run_build(arguments.config, site, directory)
+            for _ in range(arguments.builds)
+        ]
+        output_bytes = {
+            'pages': get_size(directory / 'site' / 'static', '*/index.html'),
+            'static_files': get_size(directory / 'site' / 'static', '**/*') - get_size(directory / 'site' / 'static', '*/index.html'),
+            'backend_configuration': get_size(directory / 'site', 'interactive-widgets-backend.json'),
+            'nginx_configuration': get_size(directory / 'site', 'interactive-widgets-nginx.conf'),
+        }
+
+    json.dump({
+        'pages': arguments.pages,
+        'widgets_per_page': arguments.widgets_per_page,
+        'widget_types': arguments.widget_types,
+        'config': arguments.config,
+        'input_bytes': sum(len(output.encode('utf-8')) for _, output in site),
+        'builds': builds,
+        'peak_rss_bytes': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+        'output_bytes': output_bytes,
+    }, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == '__main__':
+    main()
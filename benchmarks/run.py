@@ -0,0 +1,108 @@
+import argparse
+import itertools
+import json
+import pathlib
+import platform
+import shutil
+import subprocess
+import sys
+import typing
+
+
+BENCHMARK_DIRECTORY = pathlib.Path(__file__).resolve().parent
+
+
+def get_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'],
+            cwd=BENCHMARK_DIRECTORY,
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_hooks(pages: int, widgets_per_page: int, widget_types: typing.Optional[list], builds: int, config: str) -> dict:
+    command = [
+        sys.executable,
+        str(BENCHMARK_DIRECTORY / 'hooks.py'),
+        '--pages', str(pages),
+        '--widgets-per-page', str(widgets_per_page),
+        '--builds', str(builds),
+        '--config', config,
+    ]
+    if widget_types is not None:
+        command += ['--widget-types', *widget_types]
+    return json.loads(subprocess.run(
+        command,
+        stdout=subprocess.PIPE,
+        check=True,
+        text=True,
+    ).stdout)
+
+
+def run_client(node: str) -> dict:
+    return json.loads(subprocess.run(
+        [node, str(BENCHMARK_DIRECTORY / 'client.js')],
+        stdout=subprocess.PIPE,
+        check=True,
+        text=True,
+    ).stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Run the plugin hook and client benchmarks and write the results as JSON')
+    parser.add_argument('--output', type=pathlib.Path, required=True)
+    parser.add_argument('--pages', type=int, nargs='+', default=[10, 100])
+    parser.add_argument('--widgets-per-page', type=int,
+                        nargs='+', default=[1, 10])
+    parser.add_argument('--widget-types', nargs='+')
+    parser.add_argument('--builds', type=int, default=2)
+    parser.add_argument('--config', default='{}',
+                        help='plugin configuration as JSON object')
+    parser.add_argument('--node', default='node')
+    parser.add_argument('--skip-client', action='store_true')
+    arguments = parser.parse_args()
+
+    results = {
+        'commit': get_commit(),
+        'python': platform.python_version(),
+        'node': None,
+        'hooks': [],
+        'client': None,
+    }
+    for pages, widgets_per_page in itertools.product(arguments.pages, arguments.widgets_per_page):
+        print(
+            f'Running hooks with {pages} pages and {widgets_per_page} widgets per page...', file=sys.stderr)
+        results['hooks'].append(run_hooks(
+            pages,
+            widgets_per_page,
+            arguments.widget_types,
+            arguments.builds,
+            arguments.config,
+        ))
+    if not arguments.skip_client:
+        if shutil.which(arguments.node) is None:
+            print(
+                f'Skipping client benchmarks, {arguments.node} not found', file=sys.stderr)
+        else:
+            print('Running client benchmarks...', file=sys.stderr)
+            results['node'] = subprocess.run(
+                [arguments.node, '--version'],
+                capture_output=True,
+                check=True,
+                text=True,
+            ).stdout.strip()
+            results['client'] = run_client(arguments.node)
+
+    with arguments.output.open('w') as f:
+        json.dump(results, f, indent=2)
+        print(file=f)
+
+
+if __name__ == '__main__':
+    main()
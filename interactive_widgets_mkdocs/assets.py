@@ -0,0 +1,91 @@
+import functools
+import pathlib
+import posixpath
+import re
+import typing
+
+
+STATIC_DIRECTORY = pathlib.Path(__file__).parent / 'static'
+CODEMIRROR_DIRECTORY = 'node_modules/codemirror'
+CODEMIRROR_LIB = f'{CODEMIRROR_DIRECTORY}/lib/codemirror.js'
+REQUIRE_PATTERN = re.compile(r'''require\(\s*["']([^"']+)["']\s*\)''')
+
+
+def _read_requirements(static_file: str) -> typing.List[str]:
+    try:
+        source = (STATIC_DIRECTORY / static_file).read_text(encoding='utf-8')
+    except OSError:
+        return []
+    requirements = []
+    for requirement in REQUIRE_PATTERN.findall(source):
+        requirement = posixpath.normpath(posixpath.join(
+            posixpath.dirname(static_file),
+            requirement,
+        ))
+        if not requirement.endswith('.js'):
+            requirement = f'{requirement}.js'
+        if requirement.startswith(f'{CODEMIRROR_DIRECTORY}/'):
+            requirements.append(requirement)
+    return requirements
+
+
+@functools.lru_cache(maxsize=None)
+def get_codemirror_mode_files(mode: str) -> typing.Tuple[str, ...]:
+    mode_file = posixpath.normpath(
+        f'{CODEMIRROR_DIRECTORY}/mode/{mode}/{mode}.js')
+    if not mode_file.startswith(f'{CODEMIRROR_DIRECTORY}/mode/'):
+        return ()
+
+    files = []
+    visiting = set()
+
+    def visit(static_file: str):
+        if static_file in files or static_file in visiting or static_file == CODEMIRROR_LIB:
+            return
+        visiting.add(static_file)
+        for requirement in _read_requirements(static_file):
+            visit(requirement)
+        visiting.remove(static_file)
+        files.append(static_file)
+
+    visit(mode_file)
+    return tuple(files)
+
+
+CODEMIRROR_CSS = f'{CODEMIRROR_DIRECTORY}/lib/codemirror.css'
+XTERM_LIB = 'node_modules/xterm/lib/xterm.js'
+XTERM_CSS = 'node_modules/xterm/css/xterm.css'
+XTERM_ADDON_FIT_LIB = 'node_modules/xterm-addon-fit/lib/xterm-addon-fit.js'
+ASSET_REQUIREMENTS = {
+    'ButtonWidget.js': ['Widget.js', 'OutputLog.js'],
+    'EpilogueWidget.js': ['Widget.js', 'OutputLog.js'],
+    'ImageViewerWidget.js': ['Widget.js'],
+    'PrologueWidget.js': ['Widget.js', 'OutputLog.js'],
+    'TerminalWidget.js': ['Widget.js', XTERM_LIB, XTERM_ADDON_FIT_LIB, XTERM_CSS],
+    'TextEditorWidget.js': ['Widget.js', CODEMIRROR_LIB, CODEMIRROR_CSS],
+    'TextViewerWidget.js': ['Widget.js', CODEMIRROR_LIB, CODEMIRROR_CSS],
+}
+BLOCKING_ASSETS = frozenset(['RoomConnection.js', 'MonitorMultiplexer.js'])
+
+
+def get_asset_requirements(asset: str) -> typing.List[str]:
+    if asset.startswith(f'{CODEMIRROR_DIRECTORY}/mode/'):
+        return [CODEMIRROR_LIB] + _read_requirements(asset)
+    return ASSET_REQUIREMENTS.get(asset, [])
+
+
+def resolve_assets(assets: typing.Iterable[str]) -> typing.List[str]:
+    resolved = []
+    visited = set()
+
+    def visit(asset: str):
+        if asset in visited:
+            return
+        visited.add(asset)
+        for requirement in get_asset_requirements(asset):
+            visit(requirement)
+        resolved.append(asset)
+
+    for asset in assets:
+        visit(asset)
+    return resolved
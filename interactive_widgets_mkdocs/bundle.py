@@ -0,0 +1,67 @@
+import functools
+import hashlib
+import pathlib
+import posixpath
+import re
+import typing
+
+try:
+    import rcssmin
+    import rjsmin
+except ImportError:
+    rcssmin = None
+    rjsmin = None
+
+from .assets import STATIC_DIRECTORY
+
+
+BUNDLE_DIRECTORY = 'bundles'
+SOURCE_MAP_PATTERN = re.compile(r'^[ \t]*//[#@] sourceMappingURL=.*$', re.MULTILINE)
+CSS_URL_PATTERN = re.compile(r'''url\(\s*(["']?)([^"')]+)\1\s*\)''')
+
+
+def _rebase_css_urls(source: str, static_file: str) -> str:
+    def rebase(match: re.Match) -> str:
+        url = match.group(2)
+        if re.match(r'^(?:[a-z][a-z0-9+.-]*:|/|#)', url, re.IGNORECASE):
+            return match.group(0)
+        url = posixpath.relpath(
+            posixpath.normpath(posixpath.join(
+                posixpath.dirname(static_file), url)),
+            BUNDLE_DIRECTORY,
+        )
+        return f'url({match.group(1)}{url}{match.group(1)})'
+    return CSS_URL_PATTERN.sub(rebase, source)
+
+
+@functools.lru_cache(maxsize=None)
+def get_bundle_contents(static_files: typing.Tuple[str, ...], minify: bool) -> bytes:
+    sources = []
+    for static_file in static_files:
+        source = (STATIC_DIRECTORY / static_file).read_text(encoding='utf-8')
+        if static_file.endswith('.css'):
+            sources.append(_rebase_css_urls(source, static_file))
+        else:
+            sources.append(SOURCE_MAP_PATTERN.sub('', source))
+    if static_files[0].endswith('.css'):
+        contents = '\n'.join(sources)
+        if minify and rcssmin is not None:
+            contents = rcssmin.cssmin(contents)
+    else:
+        contents = ';\n'.join(sources)
+        if minify and rjsmin is not None:
+            contents = rjsmin.jsmin(contents)
+    return contents.encode('utf-8')
+
+
+def get_bundle_name(static_files: typing.Tuple[str, ...], minify: bool) -> str:
+    digest = hashlib.sha256(
+        get_bundle_contents(static_files, minify)).hexdigest()
+    return f'{BUNDLE_DIRECTORY}/{digest[:16]}{pathlib.PurePosixPath(static_files[0]).suffix}'
+
+
+def write_bundle(path: pathlib.Path, static_files: typing.Tuple[str, ...], minify: bool):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary_path = path.with_suffix('.tmp')
+    temporary_path.write_bytes(get_bundle_contents(static_files, minify))
+    temporary_path.replace(path)
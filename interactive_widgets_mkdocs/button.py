@@ -15,6 +15,7 @@ class ButtonWidget(Widget):
         self.image = self.tag['image']
         self.label = self.tag['label']
         self.working_directory = self.tag.get('working-directory', None)
+        self.max_output_lines = self._get_max_output_lines()
         self.memory_limit_bytes = self.tag.get(
             'memory-limit-bytes', self.config['backend_default_memory_limit_bytes'])
         self.cpu_limit = self.tag.get(
@@ -34,15 +35,8 @@ class ButtonWidget(Widget):
     def __str__(self) -> str:
         return f'ButtonWidget(name={repr(self.name)}, command={repr(self.command)}, image={repr(self.image)}, label={repr(self.label)}, working_directory={repr(self.working_directory)})'
 
-    def get_static_files(self):
-        return ['ButtonWidget.js', 'Widget.js']
-
-    def get_dependencies(self) -> typing.List[bs4.element.Tag]:
-        script_widget = self.soup.new_tag('script')
-        script_widget['src'] = self._relative('/Widget.js')
-        script_button_widget = self.soup.new_tag('script')
-        script_button_widget['src'] = self._relative('/ButtonWidget.js')
-        return [script_widget, script_button_widget]
+    def get_assets(self) -> typing.List[str]:
+        return ['ButtonWidget.js']
 
     def get_replacement(self) -> bs4.element.Tag:
         div = self.soup.new_tag('div')
@@ -50,36 +44,12 @@ class ButtonWidget(Widget):
         div['class'] = 'interactive-widgets-container'
         return div
 
-    def get_instantiation(self) -> bs4.element.Tag:
-        script = self.soup.new_tag('script')
-        script.append(f'''
-            {{
-                roomConnection.addWidget();
-                const widget = new ButtonWidget(
-                    document.getElementById("widget-button-{self.name}"),
-                    "{self._sanitize_javascript(self.command)}",
-                    "{self._sanitize_javascript(self.label)}",
-                );
-                widget.addEventListener("ready", function _listener() {{
-                    roomConnection.markWidgetReady();
-                    widget.removeEventListener("ready", _listener);
-                }});
-                widget.addEventListener("message", event => {{
-                    roomConnection.sendMessage("{self.name}", event.detail);
-                }});
-                roomConnection.addEventListener("connect", event => {{
-                    widget.handleOpen();
-                }});
-                roomConnection.addEventListener("disconnect", event => {{
-                    widget.handleClose();
-                }});
-                roomConnection.addEventListener("{self.name}", event => {{
-                    widget.handleMessage(event.detail);
-                }});
-                widget.start();
-            }}
-        ''')
-        return script
+    def get_manifest_entry(self) -> dict:
+        return self._get_manifest_entry(f'widget-button-{self.name}', [
+            self.command,
+            self.label,
+            self.max_output_lines,
+        ])
 
     def get_backend_configuration(self) -> dict:
         configuration = {
@@ -0,0 +1,82 @@
+import functools
+import hashlib
+import json
+import pathlib
+import typing
+
+from . import __version__
+from .assets import STATIC_DIRECTORY
+
+
+PACKAGE_DIRECTORY = pathlib.Path(__file__).parent
+
+
+@functools.lru_cache(maxsize=None)
+def get_source_hash() -> str:
+    digest = hashlib.sha256()
+    paths = list(PACKAGE_DIRECTORY.glob('*.py')) + [
+        path
+        for path in STATIC_DIRECTORY.iterdir()
+        if path.is_file()
+    ]
+    for path in sorted(paths):
+        digest.update(path.relative_to(PACKAGE_DIRECTORY).as_posix().encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(path.read_bytes())
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class Cache:
+
+    def __init__(self, directory: pathlib.Path, config: dict):
+        self.directory = directory / 'pages'
+        self.salt = json.dumps(
+            [__version__, get_source_hash(), dict(config)],
+            sort_keys=True,
+            default=str,
+        )
+        self.used = set()
+        self.hits = 0
+        self.misses = 0
+
+    def _get_path(self, page_url: str) -> pathlib.Path:
+        return self.directory / f'{hashlib.sha256(page_url.encode("utf-8")).hexdigest()}.json'
+
+    def get_key(self, page_url: str, output: str) -> str:
+        return hashlib.sha256(b'\0'.join([
+            self.salt.encode('utf-8'),
+            page_url.encode('utf-8'),
+            output.encode('utf-8'),
+        ])).hexdigest()
+
+    def get(self, page_url: str, key: str) -> typing.Optional[dict]:
+        self.used.add(self._get_path(page_url).name)
+        try:
+            with self._get_path(page_url).open() as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            entry = None
+        if entry is None or entry.get('key') != key:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry['entry']
+
+    def set(self, page_url: str, key: str, entry: dict):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._get_path(page_url)
+        temporary_path = path.with_suffix('.tmp')
+        with temporary_path.open('w') as f:
+            json.dump({'key': key, 'page_url': page_url, 'entry': entry}, f)
+        temporary_path.replace(path)
+
+    def evict(self) -> int:
+        evicted = 0
+        if self.directory.is_dir():
+            for path in self.directory.iterdir():
+                if path.name not in self.used:
+                    path.unlink()
+                    evicted += 1
+        self.used = set()
+        return evicted
@@ -0,0 +1,111 @@
+import json
+import math
+import mkdocs
+import pathlib
+import typing
+
+from .limits import parse_limits
+
+
+log = mkdocs.plugins.log.getChild('interactive-widgets')
+
+
+class CapacityReport:
+
+    def __init__(self, pages: typing.Dict[str, dict], node_memory_bytes: typing.Optional[int], node_cpus: typing.Optional[float], node_pids: typing.Optional[int]):
+        self.node = {
+            'memory_limit_bytes': node_memory_bytes,
+            'cpu_limit': node_cpus,
+            'pids_limit': node_pids,
+        }
+        executors = {}
+        self.rooms = {}
+        for page_url, page in pages.items():
+            if page is None:
+                continue
+            room_scope = page.get('room_scope', page_url)
+            executors.setdefault(room_scope, {}).update({
+                name: dict(executor, **parse_limits(page_url, name, executor))
+                for name, executor in page['executors'].items()
+            })
+            self.rooms.setdefault(room_scope, {'pages': []})[
+                'pages'].append(page_url)
+        for room_scope, room in self.rooms.items():
+            room.update(self._get_totals(executors[room_scope]))
+            room['rooms_per_node'] = self._get_rooms_per_node(room)
+
+    def _get_totals(self, executors: typing.Dict[str, dict]) -> dict:
+        totals = {
+            'executors': {},
+            'memory_limit_bytes': 0,
+            'cpu_limit': 0.0,
+            'pids_limit': 0,
+        }
+        for executor in executors.values():
+            totals['executors'][executor['type']] = totals['executors'].get(
+                executor['type'], 0) + 1
+            totals['memory_limit_bytes'] += executor['memory_limit_bytes']
+            totals['cpu_limit'] += executor['cpu_limit']
+            totals['pids_limit'] += executor['pids_limit']
+        return totals
+
+    def _get_rooms_per_node(self, room: dict) -> typing.Optional[int]:
+        rooms_per_node = [
+            math.floor(node_limit / room[key])
+            for key, node_limit in self.node.items()
+            if node_limit is not None and room[key] > 0
+        ]
+        if len(rooms_per_node) == 0:
+            return None
+        return min(rooms_per_node)
+
+    def get_densest_rooms(self) -> typing.List[typing.Tuple[str, dict]]:
+        return sorted(self.rooms.items(), key=lambda item: (
+            -item[1]['memory_limit_bytes'],
+            -item[1]['cpu_limit'],
+            -item[1]['pids_limit'],
+            item[0],
+        ))
+
+    def get_rooms_per_node(self) -> typing.Optional[int]:
+        rooms_per_node = [
+            room['rooms_per_node']
+            for room in self.rooms.values()
+            if room['rooms_per_node'] is not None
+        ]
+        if len(rooms_per_node) == 0:
+            return None
+        return min(rooms_per_node)
+
+    def write(self, path: pathlib.Path):
+        with path.open('w') as f:
+            json.dump({
+                'node': self.node,
+                'rooms_per_node': self.get_rooms_per_node(),
+                'rooms': dict(self.get_densest_rooms()),
+            }, f, indent=2)
+
+    def log_summary(self, top: int):
+        rooms_per_node = self.get_rooms_per_node()
+        log.info(
+            f'Capacity report: {len(self.rooms)} rooms{f", {rooms_per_node} rooms of the densest kind per node" if rooms_per_node is not None else ""}')
+        for room_scope, room in self.get_densest_rooms()[:top]:
+            executors = ', '.join(
+                f'{count} {executor_type}'
+                for executor_type, count in sorted(room['executors'].items())
+            )
+            log.info(
+                f'  {room_scope}: {room["memory_limit_bytes"]} bytes, {room["cpu_limit"]:g} CPUs, {room["pids_limit"]} PIDs ({executors})')
+
+    def get_budget_violations(self, memory_bytes: typing.Optional[int], cpus: typing.Optional[float], pids: typing.Optional[int]) -> typing.List[str]:
+        violations = []
+        for room_scope, room in self.get_densest_rooms():
+            for key, budget, unit in [
+                ('memory_limit_bytes', memory_bytes, 'bytes'),
+                ('cpu_limit', cpus, 'CPUs'),
+                ('pids_limit', pids, 'PIDs'),
+            ]:
+                if budget is not None and room[key] > budget:
+                    violations.append(
+                        f'Room {room_scope} (pages {", ".join(room["pages"])}) needs up to {room[key]} {unit}, budget is {budget} {unit}')
+        return violations
@@ -0,0 +1,122 @@
+import concurrent.futures
+import gzip
+import json
+import os
+import pathlib
+import typing
+
+try:
+    import brotli as brotli_module
+except ImportError:
+    brotli_module = None
+
+
+COMPRESSIBLE_SUFFIXES = {
+    '.css',
+    '.html',
+    '.js',
+    '.json',
+    '.map',
+    '.svg',
+    '.txt',
+    '.xml',
+}
+
+
+def _compress_gzip(data: bytes) -> bytes:
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def _compress_brotli(data: bytes) -> bytes:
+    return brotli_module.compress(data, quality=11)
+
+
+class Precompressor:
+
+    def __init__(self, manifest_path: pathlib.Path, gzip: bool, brotli: bool, min_size_bytes: int, workers: typing.Optional[int]):
+        self.manifest_path = manifest_path
+        self.compressors = {
+            '.gz': _compress_gzip,
+            '.br': _compress_brotli,
+        }
+        self.suffixes = []
+        if gzip:
+            self.suffixes.append('.gz')
+        if brotli:
+            self.suffixes.append('.br')
+        self.min_size_bytes = min_size_bytes
+        self.workers = workers
+        self.compressed_files = 0
+        self.compressed_bytes = 0
+        self.skipped_files = 0
+        self.removed_files = 0
+
+    def _load_manifest(self, directory: pathlib.Path) -> typing.Set[str]:
+        try:
+            with self.manifest_path.open() as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return set()
+        if manifest.get('directory') != str(directory.resolve()):
+            return set()
+        return set(manifest.get('files', []))
+
+    def _save_manifest(self, directory: pathlib.Path, files: typing.Set[str]):
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        temporary_path = self.manifest_path.with_suffix('.tmp')
+        with temporary_path.open('w') as f:
+            json.dump({
+                'directory': str(directory.resolve()),
+                'files': sorted(files),
+            }, f)
+        temporary_path.replace(self.manifest_path)
+
+    def _compress(self, path: pathlib.Path, suffix: str):
+        source_stat = path.stat()
+        target = path.with_name(path.name + suffix)
+        temporary_path = path.with_name(path.name + suffix + '.tmp')
+        temporary_path.write_bytes(self.compressors[suffix](path.read_bytes()))
+        os.utime(
+            temporary_path,
+            ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns),
+        )
+        temporary_path.replace(target)
+        return target.stat().st_size
+
+    def compress(self, directory: pathlib.Path, paths: typing.Iterable[pathlib.Path]):
+        previous_files = self._load_manifest(directory)
+        files = set()
+        jobs = []
+        for path in sorted(paths):
+            if path.suffix not in COMPRESSIBLE_SUFFIXES or not path.is_file():
+                continue
+            source_stat = path.stat()
+            if source_stat.st_size < self.min_size_bytes:
+                continue
+            for suffix in self.suffixes:
+                target = path.with_name(path.name + suffix)
+                target_file = target.relative_to(directory).as_posix()
+                try:
+                    target_mtime = target.stat().st_mtime_ns
+                except OSError:
+                    target_mtime = None
+                if target_mtime == source_stat.st_mtime_ns:
+                    self.skipped_files += 1
+                elif target_mtime is not None and target_file not in previous_files:
+                    continue
+                else:
+                    jobs.append((path, suffix))
+                files.add(target_file)
+
+        with concurrent.futures.ThreadPoolExecutor(self.workers) as executor:
+            for compressed_size in executor.map(lambda job: self._compress(*job), jobs):
+                self.compressed_files += 1
+                self.compressed_bytes += compressed_size
+
+        for target_file in previous_files - files:
+            target = directory / target_file
+            if target.is_file():
+                target.unlink()
+                self.removed_files += 1
+
+        self._save_manifest(directory, files)
@@ -15,6 +15,7 @@ class EpilogueWidget(Widget):
         self.image = self.tag['image']
         self.hidden = self.tag.has_attr('hidden')
         self.working_directory = self.tag.get('working-directory', None)
+        self.max_output_lines = self._get_max_output_lines()
         self.memory_limit_bytes = self.tag.get(
             'memory-limit-bytes', self.config['backend_default_memory_limit_bytes'])
         self.cpu_limit = self.tag.get(
@@ -33,15 +34,8 @@ class EpilogueWidget(Widget):
     def __str__(self) -> str:
         return f'EpilogueWidget(name={repr(self.name)}, command={repr(self.command)}, image={repr(self.image)}, hidden={repr(self.hidden)}, working_directory={repr(self.working_directory)})'
 
-    def get_static_files(self):
-        return ['EpilogueWidget.js', 'Widget.js']
-
-    def get_dependencies(self) -> typing.List[bs4.element.Tag]:
-        script_widget = self.soup.new_tag('script')
-        script_widget['src'] = self._relative('/Widget.js')
-        script_epilogue_widget = self.soup.new_tag('script')
-        script_epilogue_widget['src'] = self._relative('/EpilogueWidget.js')
-        return [script_widget, script_epilogue_widget]
+    def get_assets(self) -> typing.List[str]:
+        return ['EpilogueWidget.js']
 
     def get_replacement(self) -> typing.Optional[bs4.element.Tag]:
         if not self.hidden:
@@ -50,27 +44,12 @@ class EpilogueWidget(Widget):
             div['class'] = 'interactive-widgets-container'
             return div
 
-    def get_instantiation(self) -> bs4.element.Tag:
-        script = self.soup.new_tag('script')
-        script.append(f'''
-            {{
-                roomConnection.addWidget();
-                const widget = new EpilogueWidget(
-                    document.getElementById("widget-epilogue-{self.name}"),
-                    "{self._sanitize_javascript(self.command)}",
-                    {"true" if self.hidden else "false"},
-                );
-                widget.addEventListener("ready", function _listener() {{
-                    roomConnection.markWidgetReady();
-                    widget.removeEventListener("ready", _listener);
-                }});
-                roomConnection.addEventListener("{self.name}", event => {{
-                    widget.handleMessage(event.detail);
-                }});
-                widget.start();
-            }}
-        ''')
-        return script
+    def get_manifest_entry(self) -> dict:
+        return self._get_manifest_entry(f'widget-epilogue-{self.name}', [
+            self.command,
+            self.hidden,
+            self.max_output_lines,
+        ])
 
     def get_backend_configuration(self) -> dict:
         configuration = {
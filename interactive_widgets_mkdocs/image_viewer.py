@@ -3,10 +3,10 @@ import mkdocs
 import pathlib
 import typing
 
-from .widget import Widget
+from .monitor import MonitorWidget
 
 
-class ImageViewerWidget(Widget):
+class ImageViewerWidget(MonitorWidget):
 
     def __init__(self, config: mkdocs.config.base.Config, url: pathlib.PurePosixPath, soup: bs4.BeautifulSoup, index: int, tag: bs4.element.Tag):
         super().__init__(config, url, soup, index, tag)
@@ -20,6 +20,8 @@ class ImageViewerWidget(Widget):
             'failure-timeout',
             str(self.config['backend_monitor_default_failure_timeout']),
         )
+        self.max_bytes = self.tag.get('max-bytes')
+        self.max_dimension = self.tag.get('max-dimension')
         self.memory_limit_bytes = self.tag.get(
             'memory-limit-bytes', self.config['backend_default_memory_limit_bytes'])
         self.cpu_limit = self.tag.get(
@@ -34,20 +36,18 @@ class ImageViewerWidget(Widget):
             self.mime,
             self.success_timeout,
             self.failure_timeout,
+            *[
+                f'{attribute}={value}'
+                for attribute, value in [('max-bytes', self.max_bytes), ('max-dimension', self.max_dimension)]
+                if value is not None
+            ],
         )
 
     def __str__(self) -> str:
         return f'ImageViewerWidget(name={repr(self.name)}, file={repr(self.file)}, mime={repr(self.mime)})'
 
-    def get_static_files(self):
-        return ['ImageViewerWidget.js', 'Widget.js']
-
-    def get_dependencies(self) -> typing.List[bs4.element.Tag]:
-        script_widget = self.soup.new_tag('script')
-        script_widget['src'] = self._relative('/Widget.js')
-        script_image_viewer_widget = self.soup.new_tag('script')
-        script_image_viewer_widget['src'] = self._relative('/ImageViewerWidget.js')
-        return [script_widget, script_image_viewer_widget]
+    def get_assets(self) -> typing.List[str]:
+        return ['ImageViewerWidget.js']
 
     def get_replacement(self) -> bs4.element.Tag:
         div = self.soup.new_tag('div')
@@ -55,40 +55,20 @@ class ImageViewerWidget(Widget):
         div['class'] = 'interactive-widgets-container'
         return div
 
-    def get_instantiation(self) -> bs4.element.Tag:
-        script = self.soup.new_tag('script')
-        script.append(f'''
-            {{
-                roomConnection.addWidget();
-                const widget = new ImageViewerWidget(
-                    document.getElementById("widget-image-viewer-{self.name}"),
-                    "{self._sanitize_javascript(self.file)}",
-                    "{self._sanitize_javascript(self.mime)}",
-                );
-                widget.addEventListener("ready", function _listener() {{
-                    roomConnection.markWidgetReady();
-                    widget.removeEventListener("ready", _listener);
-                }});
-                roomConnection.addEventListener("{self.name}", event => {{
-                    widget.handleMessage(event.detail);
-                }});
-                widget.start();
-            }}
-        ''')
-        return script
+    def get_manifest_entry(self) -> dict:
+        return self._get_manifest_entry(f'widget-image-viewer-{self.name}', [
+            self.file,
+            self.mime,
+        ])
 
-    def get_backend_configuration(self) -> dict:
-        return {
-            'type': 'always',
-            'logger_name': f'{self.config["backend_type"].capitalize()}Always',
-            'image': self.config['backend_monitor_image'],
-            'command': [
-                self.config['backend_monitor_command'],
-                self.file,
-                self.success_timeout,
-                self.failure_timeout,
-            ],
-            'memory_limit_bytes': self.memory_limit_bytes,
-            'cpu_limit': self.cpu_limit,
-            'pids_limit': self.pids_limit,
-        }
+    def get_monitor_arguments(self) -> typing.List[str]:
+        arguments = [
+            self.file,
+            self.success_timeout,
+            self.failure_timeout,
+        ]
+        if self.max_bytes is not None:
+            arguments += ['--max-bytes', self.max_bytes]
+        if self.max_dimension is not None:
+            arguments += ['--max-dimension', self.max_dimension]
+        return arguments
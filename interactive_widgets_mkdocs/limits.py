@@ -0,0 +1,24 @@
+import math
+import mkdocs.exceptions
+import typing
+
+
+LIMIT_TYPES = {
+    'memory_limit_bytes': int,
+    'cpu_limit': float,
+    'pids_limit': int,
+}
+
+
+def parse_limits(page_url: str, executor_name: str, executor: dict) -> typing.Dict[str, typing.Union[int, float]]:
+    limits = {}
+    for key, limit_type in LIMIT_TYPES.items():
+        try:
+            value = float(executor[key])
+        except (TypeError, ValueError):
+            value = math.nan
+        if not math.isfinite(value) or value < 0:
+            raise mkdocs.exceptions.PluginError(
+                f'{key} of executor {executor_name} on page {page_url} must be a non-negative number, got {executor[key]!r}')
+        limits[key] = limit_type(value)
+    return limits
@@ -0,0 +1,85 @@
+import bs4
+import json
+import mkdocs
+import pathlib
+import typing
+
+from .widget import Widget
+
+
+LIMIT_ATTRIBUTES = ['memory-limit-bytes', 'cpu-limit', 'pids-limit']
+
+
+class MonitorWidget(Widget):
+
+    def __init__(self, config: mkdocs.config.base.Config, url: pathlib.PurePosixPath, soup: bs4.BeautifulSoup, index: int, tag: bs4.element.Tag):
+        super().__init__(config, url, soup, index, tag)
+        self.start = self._get_start()
+        self.multiplexer = None
+
+    def is_multiplexable(self) -> bool:
+        return self.config['monitor_multiplex'] and self.start != 'on-demand' and not any(
+            self.tag.has_attr(attribute)
+            for attribute in LIMIT_ATTRIBUTES
+        )
+
+    def _get_manifest_entry(self, element_id: str, parameters: list) -> dict:
+        entry = super()._get_manifest_entry(element_id, parameters)
+        if self.multiplexer is not None:
+            entry['multiplexed'] = True
+        return entry
+
+    def get_backend_configuration(self) -> dict:
+        configuration = {
+            'type': 'always',
+            'logger_name': f'{self.config["backend_type"].capitalize()}Always',
+            'image': self.config['backend_monitor_image'],
+            'command': [self.config['backend_monitor_command']] + self.get_monitor_arguments(),
+            'memory_limit_bytes': self.memory_limit_bytes,
+            'cpu_limit': self.cpu_limit,
+            'pids_limit': self.pids_limit,
+        }
+        if self.start == 'on-demand':
+            configuration['start'] = 'on-demand'
+        return configuration
+
+
+class MonitorMultiplexer(Widget):
+
+    def __init__(self, config: mkdocs.config.base.Config, url: pathlib.PurePosixPath, soup: bs4.BeautifulSoup, widgets: typing.List[MonitorWidget]):
+        super().__init__(config, url, soup, None, None)
+        self.widgets = widgets
+        self.name = self._hash_inputs(
+            'monitor-multiplexer',
+            self.widgets[0].room_scope or str(self.url),
+            *[widget.name for widget in self.widgets],
+        )
+        for widget in self.widgets:
+            widget.multiplexer = self
+
+    def __str__(self) -> str:
+        return f'MonitorMultiplexer(name={repr(self.name)}, widgets={len(self.widgets)})'
+
+    def get_assets(self) -> typing.List[str]:
+        return ['MonitorMultiplexer.js']
+
+    def get_construction(self) -> str:
+        return f'const monitorMultiplexer = new MonitorMultiplexer(roomConnection, "{self.name}");'
+
+    def get_backend_configuration(self) -> dict:
+        return {
+            'type': 'always',
+            'logger_name': f'{self.config["backend_type"].capitalize()}Always',
+            'image': self.config['backend_monitor_image'],
+            'command': [
+                self.config['backend_monitor_command'],
+                '--multiplex',
+                json.dumps({
+                    widget.name: widget.get_monitor_arguments()
+                    for widget in self.widgets
+                }),
+            ],
+            'memory_limit_bytes': self.config['backend_default_memory_limit_bytes'],
+            'cpu_limit': self.config['backend_default_cpu_limit'],
+            'pids_limit': self.config['backend_default_pids_limit'],
+        }
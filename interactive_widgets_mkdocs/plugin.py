@@ -1,17 +1,23 @@
-import bs4
+import concurrent.futures
+import itertools
 import json
 import mkdocs
-import os
+import mkdocs.exceptions
 import pathlib
-import shutil
+import time
+import typing
 
-from .button import ButtonWidget
-from .epilogue import EpilogueWidget
-from .image_viewer import ImageViewerWidget
-from .prologue import PrologueWidget
-from .terminal import TerminalWidget
-from .text_editor import TextEditorWidget
-from .text_viewer import TextViewerWidget
+from . import bundle
+from . import compress
+from . import prewarm
+from . import rewriter
+from . import shard
+from .assets import STATIC_DIRECTORY
+from .cache import Cache
+from .capacity import CapacityReport
+from .report import BuildReport, Stopwatch
+from .sync import StaticFileSync
+from .widget import WIDGET_STARTS
 
 
 log = mkdocs.plugins.log.getChild('interactive-widgets')
@@ -27,6 +33,34 @@ class Plugin(mkdocs.plugins.BasePlugin):
         ('nginx_https_certificate', mkdocs.config.config_options.Type(str, default=None)),
         ('nginx_https_certificate_key',
          mkdocs.config.config_options.Type(str, default=None)),
+        ('nginx_image', mkdocs.config.config_options.Type(str, default='nginx')),
+        ('nginx_websocket_location', mkdocs.config.config_options.Choice(
+            ['page', 'regex'],
+            default='page',
+        )),
+        ('nginx_upstream_keepalive',
+         mkdocs.config.config_options.Type(int, default=32)),
+        ('nginx_proxy_read_timeout',
+         mkdocs.config.config_options.Type(str, default='1h')),
+        ('nginx_proxy_send_timeout',
+         mkdocs.config.config_options.Type(str, default='1h')),
+        ('nginx_sendfile', mkdocs.config.config_options.Type(bool, default=True)),
+        ('nginx_open_file_cache_max',
+         mkdocs.config.config_options.Type(int, default=1000)),
+        ('nginx_open_file_cache_inactive',
+         mkdocs.config.config_options.Type(str, default='60s')),
+        ('nginx_immutable_max_age',
+         mkdocs.config.config_options.Type(int, default=365*24*60*60)),
+        ('precompress_gzip', mkdocs.config.config_options.Type(bool, default=True)),
+        ('precompress_brotli', mkdocs.config.config_options.Type(bool, default=False)),
+        ('precompress_scope', mkdocs.config.config_options.Choice(
+            ['static', 'site'],
+            default='static',
+        )),
+        ('precompress_min_size_bytes',
+         mkdocs.config.config_options.Type(int, default=1024)),
+        ('precompress_workers',
+         mkdocs.config.config_options.Type(int, default=None)),
         ('backend_host', mkdocs.config.config_options.Type(str, default='*')),
         ('backend_port', mkdocs.config.config_options.Type(int, default=80)),
         ('backend_type', mkdocs.config.config_options.Type(str, default='docker')),
@@ -52,11 +86,87 @@ class Plugin(mkdocs.plugins.BasePlugin):
          mkdocs.config.config_options.Type(float, default=1.0)),
         ('backend_default_pids_limit',
          mkdocs.config.config_options.Type(int, default=128)),
+        ('backend_configuration_sharded',
+         mkdocs.config.config_options.Type(bool, default=False)),
+        ('backend_prewarm', mkdocs.config.config_options.Type(int, default=0)),
+        ('backend_prewarm_images',
+         mkdocs.config.config_options.Type(dict, default={})),
+        ('monitor_protocol', mkdocs.config.config_options.Choice(
+            ['snapshot', 'delta'],
+            default='snapshot',
+        )),
+        ('monitor_multiplex', mkdocs.config.config_options.Type(bool, default=False)),
+        ('widget_default_start', mkdocs.config.config_options.Choice(
+            WIDGET_STARTS,
+            default='eager',
+        )),
+        ('room_scope', mkdocs.config.config_options.Choice(
+            ['site', 'section', 'page'],
+            default='page',
+        )),
+        ('output_log_max_lines',
+         mkdocs.config.config_options.Type(int, default=1000)),
+        ('terminal_flow_control_high_watermark',
+         mkdocs.config.config_options.Type(int, default=128*1024)),
+        ('terminal_flow_control_low_watermark',
+         mkdocs.config.config_options.Type(int, default=16*1024)),
+        ('websocket_binary_protocol',
+         mkdocs.config.config_options.Type(bool, default=False)),
+        ('parallel_rewrite', mkdocs.config.config_options.Type(bool, default=False)),
+        ('parallel_rewrite_processes',
+         mkdocs.config.config_options.Type(int, default=None)),
+        ('static_files_link', mkdocs.config.config_options.Choice(
+            ['copy', 'hardlink', 'reflink'],
+            default='copy',
+        )),
+        ('script_loading', mkdocs.config.config_options.Choice(
+            ['blocking', 'defer'],
+            default='defer',
+        )),
+        ('script_preload', mkdocs.config.config_options.Type(bool, default=False)),
+        ('bundle', mkdocs.config.config_options.Type(bool, default=False)),
+        ('bundle_minify', mkdocs.config.config_options.Type(bool, default=True)),
+        ('cache', mkdocs.config.config_options.Type(bool, default=True)),
+        ('build_report', mkdocs.config.config_options.Type(bool, default=False)),
+        ('build_report_top', mkdocs.config.config_options.Type(int, default=10)),
+        ('build_budget_page_seconds',
+         mkdocs.config.config_options.Type(float, default=None)),
+        ('build_budget_page_bytes',
+         mkdocs.config.config_options.Type(int, default=None)),
+        ('build_budget_total_seconds',
+         mkdocs.config.config_options.Type(float, default=None)),
+        ('capacity_report', mkdocs.config.config_options.Type(bool, default=False)),
+        ('capacity_report_top', mkdocs.config.config_options.Type(int, default=10)),
+        ('capacity_node_memory_bytes',
+         mkdocs.config.config_options.Type(int, default=None)),
+        ('capacity_node_cpus',
+         mkdocs.config.config_options.Type(float, default=None)),
+        ('capacity_node_pids',
+         mkdocs.config.config_options.Type(int, default=None)),
+        ('capacity_budget_room_memory_bytes',
+         mkdocs.config.config_options.Type(int, default=None)),
+        ('capacity_budget_room_cpus',
+         mkdocs.config.config_options.Type(float, default=None)),
+        ('capacity_budget_room_pids',
+         mkdocs.config.config_options.Type(int, default=None)),
+        ('cache_dir', mkdocs.config.config_options.Type(
+            str,
+            default='.cache/interactive-widgets',
+        )),
     )
 
     def on_config(self, config: mkdocs.config.base.Config, *args, **kwargs) -> mkdocs.config.base.Config:
         config['site_dir_parent'] = pathlib.Path(config['site_dir'])
         config['site_dir'] = pathlib.Path(config['site_dir']) / 'static'
+        self.cache_dir = pathlib.Path(
+            config['config_file_path'] or '.').parent / self.config['cache_dir']
+        if self.config['precompress_brotli'] and compress.brotli_module is None:
+            log.warning(
+                'Brotli precompression is disabled, install brotli to enable it')
+            self.config['precompress_brotli'] = False
+        if self.config['bundle'] and self.config['bundle_minify'] and bundle.rjsmin is None:
+            log.warning(
+                'Bundles are not minified, install rjsmin and rcssmin to minify them')
         return config
 
     def on_pre_build(self, *args, **kwargs):
@@ -71,178 +181,186 @@ class Plugin(mkdocs.plugins.BasePlugin):
             },
             'pages': {},
         }
+        if self.config['websocket_binary_protocol']:
+            self.backend_configuration['websocket_protocols'] = [
+                rewriter.BINARY_PROTOCOL,
+            ]
         self.static_files = set()
+        self.bundles = {}
+        self.prewarm_weights = {}
+        self.cache = None
+        if self.config['cache']:
+            self.cache = Cache(self.cache_dir, self.config)
+        self.page_rewriter = rewriter.PageRewriter(self.config)
+        self.pending_pages = []
+        self.build_report = BuildReport()
 
     def on_post_page(self, output: str, page: mkdocs.structure.pages.Page, *args, **kwargs):
         log.info(
             f'Building {page} with backend type: {self.config["backend_type"]}',
         )
-        soup = bs4.BeautifulSoup(output, 'html.parser')
+        started = time.perf_counter()
+        if rewriter.contains_widgets(output):
+            page_url = pathlib.PurePosixPath('/') / page.url
+            if self._is_prewarm_enabled():
+                self.prewarm_weights[str(page_url)] = self._get_prewarm_weight(
+                    page_url, page)
+            cache_key = None
+            if self.cache is not None:
+                cache_key = self.cache.get_key(str(page_url), output)
+                entry = self.cache.get(str(page_url), cache_key)
+                if entry is not None:
+                    log.info(f'Using cached {page}')
+                    return self._add_entry(page_url, entry, time.perf_counter() - started, True)
 
-        widgets = [
-            {
-                'x-button': ButtonWidget,
-                'x-epilogue': EpilogueWidget,
-                'x-image-viewer': ImageViewerWidget,
-                'x-prologue': PrologueWidget,
-                'x-terminal': TerminalWidget,
-                'x-text-editor': TextEditorWidget,
-                'x-text-viewer': TextViewerWidget,
-            }[tag.name](
-                self.config,
-                pathlib.PurePosixPath(page.url),
-                soup,
-                index,
-                tag,
-            )
-            for index, tag in enumerate(soup.find_all([
-                'x-button',
-                'x-epilogue',
-                'x-image-viewer',
-                'x-prologue',
-                'x-terminal',
-                'x-text-editor',
-                'x-text-viewer',
-            ]))
-        ]
+            if self.config['parallel_rewrite']:
+                self.backend_configuration['pages'][str(page_url)] = None
+                self.pending_pages.append((page, output, cache_key))
+                return output
 
-        if len(widgets) > 0:
-            page_url = pathlib.PurePosixPath('/') / page.url
-            self.backend_configuration['pages'][str(page_url)] = {
-                'type': self.config['backend_type'],
-                'logger_name_page': 'Page',
-                'logger_name_room_connection': 'RoomConnection',
-                'logger_name_room': f'{self.config["backend_type"].capitalize()}Room',
-                'executors': {},
-            }
+            entry = self.page_rewriter.rewrite(output, page.url, str(page))
+            if entry is not None:
+                if self.cache is not None:
+                    self.cache.set(str(page_url), cache_key, entry)
+                return self._add_entry(page_url, entry, time.perf_counter() - started, False)
 
-            current_head = soup.find(string=lambda text: isinstance(
-                text, bs4.Comment) and text.string.strip() == 'interactive-widgets')
-            if current_head is None:
-                current_head = soup.select('head > *:last-child')[0]
-            assert current_head is not None
+        log.info(f'No widgets in {page}, building as static page')
+        return output
 
-            script_redirect = soup.new_tag('script')
-            script_redirect.append('''
-                const currentUrl = new URL(window.location);
-                const currentUrlSearchParams = new URLSearchParams(currentUrl.search);
-                const currentRoomName = currentUrlSearchParams.get("roomName");
-                // https://gist.github.com/johnelliott/cf77003f72f889abbc3f32785fa3df8d
-                if (currentRoomName === null || !currentRoomName.match(new RegExp(/^[0-9A-F]{8}-[0-9A-F]{4}-4[0-9A-F]{3}-[89AB][0-9A-F]{3}-[0-9A-F]{12}$/i))) {
-                    // https://gist.github.com/outbreak/316637cde245160c2579898b21837c1c
-                    const getRandomSymbol = (symbol) => {
-                        var array;
-                        if (symbol === "y") {
-                        array = ["8", "9", "a", "b"];
-                        return array[Math.floor(Math.random() * array.length)];
-                        }
-                        array = new Uint8Array(1);
-                        window.crypto.getRandomValues(array);
-                        return (array[0] % 16).toString(16);
-                    }
-                    const newRoomName = "xxxxxxxx-xxxx-4xxx-yxxx-xxxxxxxxxxxx".replace(/[xy]/g, getRandomSymbol);
-                    currentUrlSearchParams.set("roomName", newRoomName);
-                    currentUrl.search = currentUrlSearchParams;
-                    window.location.replace(currentUrl.toString());
-                }
-            ''')
-            current_head.insert_after(script_redirect)
-            current_head = script_redirect
+    def _add_entry(self, page_url: pathlib.PurePosixPath, entry: dict, seconds: float, cached: bool, parallel: bool = False) -> str:
+        self.backend_configuration['pages'][str(page_url)] = entry['page']
+        self.build_report.add_page(
+            str(page_url), seconds, cached, parallel, entry['output'], entry)
+        self.static_files |= set(entry['static_files'])
+        self.bundles.update(entry['bundles'])
+        return entry['output']
 
-            script_room_connection = soup.new_tag('script')
-            script_room_connection['src'] = os.path.relpath(
-                '/RoomConnection.js',
-                page_url,
+    def _rewrite_pending_pages(self):
+        log.info(
+            f'Rewriting {len(self.pending_pages)} pages in parallel...')
+        with concurrent.futures.ProcessPoolExecutor(self.config['parallel_rewrite_processes']) as executor:
+            entries = list(executor.map(
+                rewriter.rewrite_page,
+                itertools.repeat(dict(self.config)),
+                [output for _, output, _ in self.pending_pages],
+                [page.url for page, _, _ in self.pending_pages],
+                [str(page) for page, _, _ in self.pending_pages],
+            ))
+        for (page, output, cache_key), entry in zip(self.pending_pages, entries):
+            page_url = pathlib.PurePosixPath('/') / page.url
+            if entry is None:
+                log.info(f'No widgets in {page}, building as static page')
+                del self.backend_configuration['pages'][str(page_url)]
+                continue
+            if self.cache is not None:
+                self.cache.set(str(page_url), cache_key, entry)
+            pathlib.Path(page.file.abs_dest_path).write_bytes(
+                self._add_entry(page_url, entry, sum(entry['timings'].values()), False, True).encode(
+                    'utf-8', errors='xmlcharrefreplace'),
             )
-            current_head.insert_after(script_room_connection)
-            current_head = script_room_connection
-            self.static_files |= set(['RoomConnection.js'])
+        self.pending_pages = []
 
-            script_room_connection_construction = soup.new_tag('script')
-            script_room_connection_construction.append(
-                'const roomConnection = new RoomConnection(currentRoomName);',
-            )
-            soup.body.insert(0, script_room_connection_construction)
+    def on_post_build(self, config: mkdocs.config.base.Config, *args, **kwargs):
+        post_build = self.build_report.post_build = Stopwatch()
+        if len(self.pending_pages) > 0:
+            self._rewrite_pending_pages()
+        post_build.lap('rewrite_pending_pages')
 
-            for widget in widgets:
-                log.info(f'Processing {widget}...')
-                replacement = widget.get_replacement()
-                parent_tag = widget.tag.parent
-                assert parent_tag.name == 'p'
-                if replacement is not None:
-                    parent_tag.replace_with(replacement)
-                    replacement.insert_after(widget.get_instantiation())
-                else:
-                    parent_tag.insert_after(widget.get_instantiation())
-                    parent_tag.extract()
-                for tag in widget.get_dependencies():
-                    if tag not in soup.head:
-                        current_head.insert_after(tag)
-                        current_head = tag
-                self.backend_configuration['pages'][str(page_url)]['executors'][widget.name] = widget.get_backend_configuration(
-                )
-                self.static_files |= set(widget.get_static_files())
+        if self.cache is not None:
+            evicted = self.cache.evict()
+            log.info(
+                f'Build cache: {self.cache.hits} hits, {self.cache.misses} misses, {evicted} evicted')
+        post_build.lap('cache')
 
-            script_room_connection_ready = soup.new_tag('script')
-            script_room_connection_ready.append(
-                'roomConnection.readyForConnecting();',
+        if self._is_prewarm_enabled():
+            self.backend_configuration['prewarm'] = prewarm.get_prewarm_configuration(
+                self.backend_configuration['pages'],
+                self.prewarm_weights,
+                self.config['backend_prewarm'],
+                self.config['backend_prewarm_images'],
             )
-            soup.body.append(script_room_connection_ready)
 
-            return soup.encode_contents(formatter='html5').decode()
-
-        log.info(f'No widgets in {page}, building as static page')
-        return output
-
-    def on_post_build(self, config: mkdocs.config.base.Config, *args, **kwargs):
-        if len(self.backend_configuration['pages']) > 0:
+        if len(self.backend_configuration['pages']) > 0 and self.config['backend_configuration_sharded']:
+            log.info(f'Writing {shard.SHARD_DIRECTORY}/...')
+            shard_writer = shard.ShardWriter(
+                config['site_dir_parent'] / shard.SHARD_DIRECTORY)
+            shard_writer.write(self.backend_configuration)
+            log.info(
+                f'Backend configuration shards: {shard_writer.written_files} written ({shard_writer.written_bytes} bytes), {shard_writer.skipped_files} unchanged, {shard_writer.removed_files} removed')
+        elif len(self.backend_configuration['pages']) > 0:
             log.info('Writing interactive-widgets-backend.json...')
             with (config['site_dir_parent'] / 'interactive-widgets-backend.json').open('w') as f:
                 json.dump(self.backend_configuration, f, indent=2)
+        post_build.lap('backend_configuration')
 
-            log.info('Copying static files...')
-            for static_file in self.static_files:
-                source_static_file = pathlib.Path(
-                    __file__).parent / 'static' / pathlib.Path(static_file)
-                target_static_file = config['site_dir'] / \
-                    pathlib.Path(static_file)
-                target_static_file.parent.mkdir(parents=True, exist_ok=True)
-                if source_static_file.is_file():
-                    shutil.copy(
-                        source_static_file,
-                        target_static_file,
-                    )
-                else:
-                    shutil.copytree(
-                        source_static_file,
-                        target_static_file,
-                        dirs_exist_ok=True,
+        if self.config['bundle']:
+            log.info('Writing bundles...')
+            for bundle_name, bundled_files in self.bundles.items():
+                bundle_path = self.cache_dir / bundle_name
+                if not bundle_path.is_file():
+                    bundle.write_bundle(
+                        bundle_path,
+                        tuple(bundled_files),
+                        self.config['bundle_minify'],
                     )
+        bundle_directory = self.cache_dir / bundle.BUNDLE_DIRECTORY
+        if bundle_directory.is_dir():
+            for bundle_path in bundle_directory.iterdir():
+                if f'{bundle.BUNDLE_DIRECTORY}/{bundle_path.name}' not in self.bundles:
+                    bundle_path.unlink()
+        post_build.lap('bundles')
+
+        log.info('Synchronizing static files...')
+        static_file_sync = StaticFileSync(
+            self.cache_dir / 'static-files.json',
+            self.config['static_files_link'],
+        )
+        static_files = {
+            static_file: STATIC_DIRECTORY / static_file
+            for static_file in self.static_files
+        }
+        for bundle_name in self.bundles.keys():
+            static_files[bundle_name] = self.cache_dir / bundle_name
+        static_file_sync.sync(static_files, config['site_dir'])
+        log.info(
+            f'Static files: {static_file_sync.copied_files} copied ({static_file_sync.copied_bytes} bytes), {static_file_sync.skipped_files} skipped ({static_file_sync.skipped_bytes} bytes), {static_file_sync.removed_files} removed')
+        post_build.lap('static_files')
+
+        log.info('Precompressing static files...')
+        precompressor = compress.Precompressor(
+            self.cache_dir / 'precompressed-files.json',
+            self.config['precompress_gzip'],
+            self.config['precompress_brotli'],
+            self.config['precompress_min_size_bytes'],
+            self.config['precompress_workers'],
+        )
+        if self.config['precompress_scope'] == 'site':
+            precompressed_paths = config['site_dir'].rglob('*')
+        else:
+            precompressed_paths = [
+                config['site_dir'] / target_file
+                for target_file in static_file_sync.target_files
+            ]
+        precompressor.compress(config['site_dir'], precompressed_paths)
+        log.info(
+            f'Precompressed files: {precompressor.compressed_files} written ({precompressor.compressed_bytes} bytes), {precompressor.skipped_files} skipped, {precompressor.removed_files} removed')
+        post_build.lap('precompress')
 
         log.info('Writing interactive-widgets-nginx.conf...')
         with (config['site_dir_parent'] / 'interactive-widgets-nginx.conf').open('w') as f:
             if len(self.backend_configuration['pages']) > 0:
                 print('upstream backend {', file=f)
                 print('    server interactive-widgets-backend;', file=f)
+                if self.config['nginx_upstream_keepalive'] > 0:
+                    print(
+                        f'    keepalive {self.config["nginx_upstream_keepalive"]};', file=f)
                 print('}', file=f)
             print('server {', file=f)
             print('    listen       80;', file=f)
             print(
                 f'    server_name  {self.config["nginx_server_name"]};', file=f)
-            print('    location / {', file=f)
-            print('        root /usr/share/nginx/html;', file=f)
-            print('        index index.html index.htm;', file=f)
-            print('    }', file=f)
-            for page_url in self.backend_configuration['pages'].keys():
-                websocket_url = pathlib.PurePosixPath(page_url) / 'ws'
-                proxy_url = f'http://backend{websocket_url}'
-                print(f'    location = {websocket_url} {{', file=f)
-                print(f'        proxy_pass {proxy_url};', file=f)
-                print('        proxy_http_version 1.1;', file=f)
-                print('        proxy_set_header Upgrade $http_upgrade;', file=f)
-                print('        proxy_set_header Connection "Upgrade";', file=f)
-                print('        proxy_set_header Host $host;', file=f)
-                print('    }', file=f)
+            self._print_nginx_static_locations(f)
+            self._print_nginx_websocket_locations(f)
             print('}', file=f)
             if self.config['nginx_https_certificate'] is not None and self.config['nginx_https_certificate_key'] is not None:
                 print('server {', file=f)
@@ -251,29 +369,19 @@ class Plugin(mkdocs.plugins.BasePlugin):
                 print(f'    ssl_certificate_key /tmp/nginx.key;', file=f)
                 print(
                     f'    server_name  {self.config["nginx_server_name"]};', file=f)
-                print('    location / {', file=f)
-                print('        root /usr/share/nginx/html;', file=f)
-                print('        index index.html index.htm;', file=f)
-                print('    }', file=f)
-                for page_url in self.backend_configuration['pages'].keys():
-                    websocket_url = pathlib.PurePosixPath(page_url) / 'ws'
-                    proxy_url = f'http://backend{websocket_url}'
-                    print(f'    location = {websocket_url} {{', file=f)
-                    print(f'        proxy_pass {proxy_url};', file=f)
-                    print('        proxy_http_version 1.1;', file=f)
-                    print('        proxy_set_header Upgrade $http_upgrade;', file=f)
-                    print('        proxy_set_header Connection "Upgrade";', file=f)
-                    print('        proxy_set_header Host $host;', file=f)
-                    print('    }', file=f)
+                self._print_nginx_static_locations(f)
+                self._print_nginx_websocket_locations(f)
                 print('}', file=f)
+        post_build.lap('nginx_configuration')
 
         log.info('Writing Dockerfile...')
         with (config['site_dir_parent'] / 'Dockerfile').open('w') as f:
-            print('FROM nginx', file=f)
+            print(f'FROM {self.config["nginx_image"]}', file=f)
             print(
                 'RUN rm /etc/nginx/conf.d/default.conf /usr/share/nginx/html/*', file=f)
             print('COPY interactive-widgets-nginx.conf /etc/nginx/conf.d/', file=f)
             print('COPY static/ /usr/share/nginx/html/', file=f)
+        post_build.lap('dockerfile')
 
         log.info('Writing docker-compose.yaml...')
         with (config['site_dir_parent'] / 'docker-compose.yaml').open('w') as f:
@@ -292,11 +400,126 @@ class Plugin(mkdocs.plugins.BasePlugin):
                 print(
                     f'      - "{self.config["nginx_https_certificate_key"]}:/tmp/nginx.key"', file=f)
             if len(self.backend_configuration['pages']) > 0:
+                backend_configuration_path = 'interactive-widgets-backend.json'
+                if self.config['backend_configuration_sharded']:
+                    backend_configuration_path = f'{shard.SHARD_DIRECTORY}/index.json'
                 print('  interactive-widgets-backend:', file=f)
                 print('    image: interactive-widgets-backend', file=f)
                 print('    volumes:', file=f)
-                print(
-                    '      - "./interactive-widgets-backend.json:/usr/src/app/interactive-widgets-backend.json"', file=f)
+                if self.config['backend_configuration_sharded']:
+                    print(
+                        f'      - "./{shard.SHARD_DIRECTORY}:/usr/src/app/{shard.SHARD_DIRECTORY}"', file=f)
+                else:
+                    print(
+                        '      - "./interactive-widgets-backend.json:/usr/src/app/interactive-widgets-backend.json"', file=f)
                 print('      - "/var/run/docker.sock:/var/run/docker.sock"', file=f)
                 print(
-                    '    command: ["interactive-widgets-backend", "interactive-widgets-backend.json"]', file=f)
+                    f'    command: ["interactive-widgets-backend", "{backend_configuration_path}"]', file=f)
+        post_build.lap('docker_compose')
+
+        capacity_budgets = [
+            self.config['capacity_budget_room_memory_bytes'],
+            self.config['capacity_budget_room_cpus'],
+            self.config['capacity_budget_room_pids'],
+        ]
+        capacity_report = None
+        if self.config['capacity_report'] or any(budget is not None for budget in capacity_budgets):
+            capacity_report = CapacityReport(
+                self.backend_configuration['pages'],
+                self.config['capacity_node_memory_bytes'],
+                self.config['capacity_node_cpus'],
+                self.config['capacity_node_pids'],
+            )
+        if self.config['capacity_report']:
+            log.info('Writing interactive-widgets-capacity-report.json...')
+            capacity_report.write(
+                config['site_dir_parent'] / 'interactive-widgets-capacity-report.json')
+            capacity_report.log_summary(self.config['capacity_report_top'])
+        post_build.lap('capacity_report')
+
+        if self.config['build_report']:
+            log.info('Writing interactive-widgets-build-report.json...')
+            self.build_report.write(
+                config['site_dir_parent'] / 'interactive-widgets-build-report.json')
+            self.build_report.log_summary(self.config['build_report_top'])
+        violations = self.build_report.get_budget_violations(
+            self.config['build_budget_page_seconds'],
+            self.config['build_budget_page_bytes'],
+            self.config['build_budget_total_seconds'],
+        )
+        for violation in violations:
+            log.warning(violation)
+        if len(violations) > 0 and config['strict']:
+            raise mkdocs.exceptions.PluginError(
+                f'{len(violations)} build budgets exceeded')
+        if capacity_report is not None:
+            capacity_violations = capacity_report.get_budget_violations(
+                *capacity_budgets)
+            for violation in capacity_violations:
+                log.warning(violation)
+            if len(capacity_violations) > 0 and config['strict']:
+                raise mkdocs.exceptions.PluginError(
+                    f'{len(capacity_violations)} room capacity budgets exceeded')
+
+    def _is_prewarm_enabled(self) -> bool:
+        return self.config['backend_prewarm'] > 0 or len(self.config['backend_prewarm_images']) > 0
+
+    def _get_prewarm_weight(self, page_url: pathlib.PurePosixPath, page: mkdocs.structure.pages.Page) -> float:
+        weight = page.meta.get('interactive_widgets_prewarm_weight', 1.0)
+        try:
+            return float(weight)
+        except (TypeError, ValueError):
+            raise mkdocs.exceptions.PluginError(
+                f'interactive_widgets_prewarm_weight of page {page_url} must be a number, got {weight!r}')
+
+    def _print_nginx_static_locations(self, f: typing.TextIO):
+        if self.config['nginx_sendfile']:
+            print('    sendfile on;', file=f)
+            print('    tcp_nopush on;', file=f)
+        if self.config['nginx_open_file_cache_max'] > 0:
+            print(
+                f'    open_file_cache max={self.config["nginx_open_file_cache_max"]} inactive={self.config["nginx_open_file_cache_inactive"]};', file=f)
+            print(
+                f'    open_file_cache_valid {self.config["nginx_open_file_cache_inactive"]};', file=f)
+            print('    open_file_cache_errors on;', file=f)
+        if self.config['precompress_gzip']:
+            print('    gzip_static on;', file=f)
+        if self.config['precompress_brotli']:
+            print('    brotli_static on;', file=f)
+        print('    location / {', file=f)
+        print('        root /usr/share/nginx/html;', file=f)
+        print('        index index.html index.htm;', file=f)
+        print('    }', file=f)
+        if self.config['bundle']:
+            print(f'    location /{bundle.BUNDLE_DIRECTORY}/ {{', file=f)
+            print('        root /usr/share/nginx/html;', file=f)
+            print(
+                f'        add_header Cache-Control "public, max-age={self.config["nginx_immutable_max_age"]}, immutable";', file=f)
+            print('    }', file=f)
+
+    def _print_nginx_websocket_locations(self, f: typing.TextIO):
+        if len(self.backend_configuration['pages']) == 0:
+            return
+        if self.config['nginx_websocket_location'] == 'regex':
+            locations = [('~ ^/(?:.*/)?ws$', 'http://backend')]
+        else:
+            locations = [
+                (f'= {websocket_url}', f'http://backend{websocket_url}')
+                for websocket_url in [
+                    pathlib.PurePosixPath(page_url) / 'ws'
+                    for page_url in self.backend_configuration['pages'].keys()
+                ]
+            ]
+        for location, proxy_url in locations:
+            print(f'    location {location} {{', file=f)
+            print(f'        proxy_pass {proxy_url};', file=f)
+            print('        proxy_http_version 1.1;', file=f)
+            print('        proxy_set_header Upgrade $http_upgrade;', file=f)
+            print('        proxy_set_header Connection "Upgrade";', file=f)
+            print('        proxy_set_header Host $host;', file=f)
+            print('        proxy_buffering off;', file=f)
+            print(
+                f'        proxy_read_timeout {self.config["nginx_proxy_read_timeout"]};', file=f)
+            print(
+                f'        proxy_send_timeout {self.config["nginx_proxy_send_timeout"]};', file=f)
+            print('    }', file=f)
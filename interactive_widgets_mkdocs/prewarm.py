@@ -0,0 +1,70 @@
+import math
+import typing
+
+from .limits import parse_limits
+
+
+PROFILE_KEYS = ['image', 'memory_limit_bytes', 'cpu_limit', 'pids_limit']
+
+
+def _get_profile_weights(pages: typing.Dict[str, dict], page_weights: typing.Dict[str, float]) -> typing.Dict[tuple, float]:
+    profile_weights = {}
+    for page_url, page in pages.items():
+        if page is None:
+            continue
+        for name, executor in page['executors'].items():
+            limits = parse_limits(page_url, name, executor)
+            profile = (
+                executor['image'],
+                limits['memory_limit_bytes'],
+                limits['cpu_limit'],
+                limits['pids_limit'],
+            )
+            profile_weights[profile] = profile_weights.get(
+                profile, 0.0) + page_weights.get(page_url, 1.0)
+    return profile_weights
+
+
+def _distribute(total: int, weights: typing.Dict[tuple, float]) -> typing.Dict[tuple, int]:
+    weight_sum = sum(weights.values())
+    if total <= 0 or weight_sum <= 0:
+        return {profile: 0 for profile in weights}
+    shares = {
+        profile: total * weight / weight_sum
+        for profile, weight in weights.items()
+    }
+    counts = {
+        profile: math.floor(share)
+        for profile, share in shares.items()
+    }
+    remainders = sorted(
+        shares.keys(),
+        key=lambda profile: (counts[profile] - shares[profile], -weights[profile]),
+    )
+    for profile in remainders[:total - sum(counts.values())]:
+        counts[profile] += 1
+    return counts
+
+
+def get_prewarm_configuration(pages: typing.Dict[str, dict], page_weights: typing.Dict[str, float], total: int, image_overrides: typing.Dict[str, int]) -> typing.List[dict]:
+    profile_weights = _get_profile_weights(pages, page_weights)
+    counts = _distribute(total, {
+        profile: weight
+        for profile, weight in profile_weights.items()
+        if profile[0] not in image_overrides
+    })
+    for profile in profile_weights:
+        if profile[0] in image_overrides:
+            counts[profile] = image_overrides[profile[0]]
+    return [
+        {
+            **dict(zip(PROFILE_KEYS, profile)),
+            'weight': profile_weights[profile],
+            'containers': counts[profile],
+        }
+        for profile in sorted(
+            counts.keys(),
+            key=lambda profile: (-counts[profile], -profile_weights[profile], str(profile)),
+        )
+        if counts[profile] > 0
+    ]
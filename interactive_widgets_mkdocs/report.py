@@ -0,0 +1,93 @@
+import json
+import mkdocs
+import pathlib
+import time
+import typing
+
+
+log = mkdocs.plugins.log.getChild('interactive-widgets')
+
+
+class Stopwatch:
+
+    def __init__(self):
+        self.timings = {}
+        self.last = time.perf_counter()
+
+    def lap(self, name: str):
+        now = time.perf_counter()
+        self.timings[name] = self.timings.get(name, 0.0) + now - self.last
+        self.last = now
+
+    def get_total(self) -> float:
+        return sum(self.timings.values())
+
+
+class BuildReport:
+
+    def __init__(self):
+        self.pages = {}
+        self.post_build = Stopwatch()
+
+    def add_page(self, page_url: str, seconds: float, cached: bool, parallel: bool, output: str, entry: dict):
+        page = {
+            'seconds': seconds,
+            'cached': cached,
+            'parallel': parallel,
+            'output_bytes': len(output.encode('utf-8', errors='xmlcharrefreplace')),
+            'executors': len(entry['page']['executors']),
+            'widgets': entry.get('widgets', {}),
+        }
+        if not cached:
+            page['timings'] = entry.get('timings', {})
+        self.pages[page_url] = page
+
+    def get_widgets(self) -> typing.Dict[str, int]:
+        widgets = {}
+        for page in self.pages.values():
+            for widget_type, count in page['widgets'].items():
+                widgets[widget_type] = widgets.get(widget_type, 0) + count
+        return dict(sorted(widgets.items()))
+
+    def get_total_seconds(self) -> float:
+        return sum(
+            page['seconds']
+            for page in self.pages.values()
+            if not page['parallel']
+        ) + self.post_build.get_total()
+
+    def write(self, path: pathlib.Path):
+        with path.open('w') as f:
+            json.dump({
+                'total_seconds': self.get_total_seconds(),
+                'widgets': self.get_widgets(),
+                'pages': self.pages,
+                'post_build': self.post_build.timings,
+            }, f, indent=2)
+
+    def log_summary(self, top: int):
+        log.info(
+            f'Build report: {len(self.pages)} pages with widgets, {self.get_total_seconds():.3f} seconds in total')
+        for page_url, page in sorted(self.pages.items(), key=lambda item: -item[1]['seconds'])[:top]:
+            widgets = ', '.join(
+                f'{count} {widget_type}'
+                for widget_type, count in sorted(page['widgets'].items())
+            )
+            log.info(
+                f'  {page["seconds"]:.3f}s {page_url} ({page["output_bytes"]} bytes{", cached" if page["cached"] else ""}): {widgets}')
+        for section, seconds in sorted(self.post_build.timings.items(), key=lambda item: -item[1])[:top]:
+            log.info(f'  {seconds:.3f}s on_post_build {section}')
+
+    def get_budget_violations(self, page_seconds: typing.Optional[float], page_bytes: typing.Optional[int], total_seconds: typing.Optional[float]) -> typing.List[str]:
+        violations = []
+        for page_url, page in self.pages.items():
+            if page_seconds is not None and not page['cached'] and page['seconds'] > page_seconds:
+                violations.append(
+                    f'Page {page_url} took {page["seconds"]:.3f} seconds, budget is {page_seconds} seconds')
+            if page_bytes is not None and page['output_bytes'] > page_bytes:
+                violations.append(
+                    f'Page {page_url} has {page["output_bytes"]} bytes, budget is {page_bytes} bytes')
+        if total_seconds is not None and self.get_total_seconds() > total_seconds:
+            violations.append(
+                f'Build took {self.get_total_seconds():.3f} seconds, budget is {total_seconds} seconds')
+        return violations
@@ -0,0 +1,624 @@
+import bs4
+import bs4.builder
+import bs4.formatter
+import collections
+import itertools
+import json
+import mkdocs.config.base
+import mkdocs.plugins
+import os
+import pathlib
+import posixpath
+import re
+import typing
+
+from . import bundle
+from .report import Stopwatch
+from .assets import BLOCKING_ASSETS, STATIC_DIRECTORY, resolve_assets
+from .monitor import MonitorMultiplexer, MonitorWidget
+from .button import ButtonWidget
+from .epilogue import EpilogueWidget
+from .image_viewer import ImageViewerWidget
+from .prologue import PrologueWidget
+from .terminal import TerminalWidget
+from .text_editor import TextEditorWidget
+from .text_viewer import TextViewerWidget
+
+
+log = mkdocs.plugins.log.getChild('interactive-widgets')
+
+BINARY_PROTOCOL = 'interactive-widgets.binary.v2'
+MANIFEST_ESCAPES = str.maketrans({'<': '\\u003c', '>': '\\u003e', '&': '\\u0026'})
+
+WIDGETS = {
+    'x-button': ButtonWidget,
+    'x-epilogue': EpilogueWidget,
+    'x-image-viewer': ImageViewerWidget,
+    'x-prologue': PrologueWidget,
+    'x-terminal': TerminalWidget,
+    'x-text-editor': TextEditorWidget,
+    'x-text-viewer': TextViewerWidget,
+}
+
+
+class Element:
+
+    def __init__(self, name: str, attrs: dict, parent: typing.Optional['Element'], start: int):
+        self.name = name
+        self.attrs = attrs
+        self.parent = parent
+        self.start = start
+        self.end = None
+        self.children = 0
+        self.last_element_child = None
+
+
+class Document:
+
+    original_encoding = None
+    contains_replacement_characters = False
+
+    def __init__(self, markup: str, widget_names: typing.Iterable[str]):
+        self.builder = bs4.builder.HTMLParserTreeBuilder(
+            store_line_numbers=False)
+        self.formatter = bs4.formatter.HTMLFormatter.REGISTRY['html5']
+        self.widget_names = frozenset(widget_names)
+        self.chunks = []
+        self.stack = [Element('[document]', {}, None, 0)]
+        self.open_tag_counter = {}
+        self.preserve_whitespace_stack = []
+        self.current_data = []
+        self.heads = []
+        self.bodies = []
+        self.comments = []
+        self.widgets = []
+
+        self.builder.initialize_soup(self)
+        self.builder.feed(markup)
+        self.endData()
+        while len(self.stack) > 1:
+            self.popTag()
+
+    def handle_starttag(self, name: str, namespace, nsprefix, attrs: dict, sourceline=None, sourcepos=None, namespaces=None) -> Element:
+        self.endData()
+        attrs = self._prepare_attributes(name, dict(attrs))
+        parent = self.stack[-1]
+        parent.children += 1
+        element = Element(name, attrs, parent, len(self.chunks))
+        parent.last_element_child = element
+        element.is_empty_element = name in self.builder.empty_element_tags
+        self.chunks.append(self._format_opening(element))
+        self.stack.append(element)
+        self.open_tag_counter[name] = self.open_tag_counter.get(name, 0) + 1
+        if name in self.builder.preserve_whitespace_tags:
+            self.preserve_whitespace_stack.append(element)
+        if name == 'head':
+            self.heads.append(element)
+        elif name == 'body':
+            self.bodies.append(element)
+        if name in self.widget_names:
+            self.widgets.append(element)
+        return element
+
+    def handle_endtag(self, name: str, nsprefix=None):
+        self.endData()
+        if name == '[document]':
+            return
+        for element in reversed(self.stack[1:]):
+            if not self.open_tag_counter.get(name):
+                break
+            self.popTag()
+            if element.name == name:
+                break
+
+    def handle_data(self, data: str):
+        self.current_data.append(data)
+
+    def endData(self, containerClass=None):
+        if not self.current_data:
+            return
+        data = ''.join(self.current_data)
+        self.current_data = []
+        if not self.preserve_whitespace_stack and data.strip(' \n\t\x0c\r') == '':
+            data = '\n' if '\n' in data else ' '
+        parent = self.stack[-1]
+        parent.children += 1
+        if containerClass is None or containerClass is bs4.element.NavigableString:
+            if parent.name not in self.formatter.cdata_containing_tags:
+                data = self.formatter.substitute(data)
+            self.chunks.append(data)
+            return
+        if containerClass is bs4.element.Comment:
+            self.comments.append((data, parent, len(self.chunks)))
+        self.chunks.append(containerClass(data).output_ready(self.formatter))
+
+    def popTag(self):
+        element = self.stack.pop()
+        self.open_tag_counter[element.name] -= 1
+        if self.preserve_whitespace_stack and self.preserve_whitespace_stack[-1] is element:
+            self.preserve_whitespace_stack.pop()
+        if not (element.is_empty_element and element.children == 0):
+            self.chunks.append(f'</{element.name}>')
+        element.end = len(self.chunks)
+
+    def _prepare_attributes(self, name: str, attrs: dict) -> dict:
+        list_attributes = self.builder.cdata_list_attributes
+        for key, value in attrs.items():
+            if key in list_attributes.get('*', ()) or key in list_attributes.get(name.lower(), ()):
+                attrs[key] = re.findall(r'\S+', value)
+        if name == 'meta':
+            if attrs.get('charset') is not None:
+                if attrs['charset'] != '':
+                    attrs['charset'] = 'utf-8'
+            elif attrs.get('content') is not None and attrs.get('http-equiv', '').lower() == 'content-type':
+                attrs['content'] = re.sub(
+                    r'((^|;)\s*charset=)([^;]*)',
+                    lambda match: match.group(1) + 'utf-8',
+                    attrs['content'],
+                    flags=re.M,
+                )
+        return attrs
+
+    def _format_opening(self, element: Element) -> str:
+        attributes = []
+        for key, value in sorted(element.attrs.items()):
+            if self.formatter.empty_attributes_are_booleans and value == '':
+                attributes.append(key)
+                continue
+            if isinstance(value, list):
+                value = ' '.join(value)
+            attributes.append(
+                f'{key}={self.formatter.quoted_attribute_value(self.formatter.attribute_value(value))}')
+        attribute_string = ''.join(f' {attribute}' for attribute in attributes)
+        void_element_close_prefix = ''
+        if element.is_empty_element:
+            void_element_close_prefix = self.formatter.void_element_close_prefix or ''
+        return f'<{element.name}{attribute_string}{void_element_close_prefix}>'
+
+    def find_comment(self, text: str) -> typing.Optional[typing.Tuple[Element, int]]:
+        for data, parent, index in self.comments:
+            if data.strip() == text:
+                return parent, index
+        return None
+
+    def splice(self, insertions: typing.Dict[int, typing.List[str]], replacements: typing.Dict[int, typing.Tuple[int, typing.List[str]]]) -> str:
+        output = []
+        index = 0
+        while index < len(self.chunks):
+            output.extend(insertions.get(index, []))
+            if index in replacements:
+                end, replacement = replacements[index]
+                output.extend(replacement)
+                index = end
+                continue
+            output.append(self.chunks[index])
+            index += 1
+        output.extend(insertions.get(index, []))
+        return ''.join(output)
+
+
+class PageRewriter:
+
+    def __init__(self, config: dict):
+        self.config = config
+        self.stopwatch = Stopwatch()
+
+    def rewrite(self, output: str, url: str, name: str) -> typing.Optional[dict]:
+        self.stopwatch = Stopwatch()
+        document = Document(output, WIDGETS.keys())
+        self.stopwatch.lap('parse')
+        if len(document.widgets) == 0:
+            return None
+        page_configuration = self._get_page_configuration()
+        if self.config['room_scope'] != 'page':
+            page_configuration['room_scope'] = self._get_room_scope(url)
+        static_files = set()
+        bundles = {}
+        rewritten_output = self._rewrite_document(
+            document, url, page_configuration, static_files, bundles)
+        if rewritten_output is None:
+            log.debug(f'Falling back to full rewrite of {name}')
+            rewritten_output = self._rewrite_soup(
+                output, url, page_configuration, static_files, bundles)
+        return {
+            'output': rewritten_output,
+            'page': page_configuration,
+            'static_files': sorted(static_files),
+            'bundles': bundles,
+            'timings': self.stopwatch.timings,
+            'widgets': dict(collections.Counter(
+                element.name for element in document.widgets)),
+        }
+
+    def _rewrite_document(self, document: Document, url: str, page_configuration: dict, static_files: set, bundles: dict) -> typing.Optional[str]:
+        if len(document.heads) != 1 or len(document.bodies) != 1:
+            return None
+        head = document.heads[0]
+        body = document.bodies[0]
+
+        regions = []
+        for element in document.widgets:
+            if element.parent.name != 'p':
+                return None
+            if len(regions) > 0 and element.parent.start < regions[-1][1]:
+                return None
+            regions.append((element.parent.start, element.parent.end))
+
+        comment = document.find_comment('interactive-widgets')
+        if comment is not None:
+            _, head_index = comment
+            head_index += 1
+        else:
+            if head.last_element_child is None:
+                return None
+            head_index = head.last_element_child.end
+        for index in [head_index, body.start + 1, body.end - 1]:
+            if any(start < index < end for start, end in regions):
+                return None
+
+        soup = bs4.BeautifulSoup('', 'html.parser')
+        tags = []
+        for element in document.widgets:
+            paragraph = soup.new_tag('p')
+            tag = soup.new_tag(element.name, attrs=dict(element.attrs))
+            paragraph.append(tag)
+            tags.append(tag)
+        widgets = self._get_widgets(soup, url, tags)
+        multiplexer = self._get_monitor_multiplexer(soup, url, widgets)
+        self.stopwatch.lap('construct')
+
+        page_url = pathlib.PurePosixPath('/') / url
+        head_tags = self._get_head_tags(soup, self._get_room_scope(url)) + self._get_asset_tags(
+            soup, page_url, widgets, multiplexer, set(), static_files, bundles)
+        replacements = {}
+        for widget, (start, end) in zip(widgets, regions):
+            log.info(f'Processing {widget}...')
+            replacement = widget.get_replacement()
+            replacements[start] = (end, [
+                replacement.decode(formatter='html5')
+            ] if replacement is not None else [])
+            self._add_widget(page_configuration, widget)
+        if multiplexer is not None:
+            self._add_widget(page_configuration, multiplexer)
+
+        insertions = {}
+        for index, tags in [
+            (head_index, head_tags),
+            (body.start + 1, [self._get_room_connection_construction(soup, widgets, multiplexer)]),
+            (body.end - 1, [
+                self._get_manifest(soup, widgets),
+                self._get_deferred(self._get_room_connection_ready(
+                    soup, widgets, multiplexer)),
+            ]),
+        ]:
+            insertions.setdefault(index, []).extend(
+                tag.decode(formatter='html5')
+                for tag in tags
+            )
+        self.stopwatch.lap('inject')
+        rewritten_output = document.splice(insertions, replacements)
+        self.stopwatch.lap('serialize')
+        return rewritten_output
+
+    def _rewrite_soup(self, output: str, url: str, page_configuration: dict, static_files: set, bundles: dict) -> str:
+        soup = bs4.BeautifulSoup(output, 'html.parser')
+        self.stopwatch.lap('parse')
+        widgets = self._get_widgets(
+            soup, url, soup.find_all(list(WIDGETS.keys())))
+        multiplexer = self._get_monitor_multiplexer(soup, url, widgets)
+        self.stopwatch.lap('construct')
+
+        page_url = pathlib.PurePosixPath('/') / url
+
+        current_head = soup.find(string=lambda text: isinstance(
+            text, bs4.Comment) and text.string.strip() == 'interactive-widgets')
+        if current_head is None:
+            current_head = soup.select('head > *:last-child')[0]
+        assert current_head is not None
+
+        existing_urls = set(
+            tag.get('src', tag.get('href'))
+            for tag in soup.head.find_all(['script', 'link'], recursive=False)
+        )
+        head_tags = self._get_head_tags(soup, self._get_room_scope(url)) + self._get_asset_tags(
+            soup, page_url, widgets, multiplexer, existing_urls, static_files, bundles)
+
+        soup.body.insert(
+            0, self._get_room_connection_construction(soup, widgets, multiplexer))
+
+        for widget in widgets:
+            log.info(f'Processing {widget}...')
+            replacement = widget.get_replacement()
+            parent_tag = widget.tag.parent
+            assert parent_tag.name == 'p'
+            if replacement is not None:
+                parent_tag.replace_with(replacement)
+            else:
+                parent_tag.extract()
+            self._add_widget(page_configuration, widget)
+        if multiplexer is not None:
+            self._add_widget(page_configuration, multiplexer)
+
+        for tag in head_tags:
+            current_head.insert_after(tag)
+            current_head = tag
+
+        soup.body.append(self._get_manifest(soup, widgets))
+        soup.body.append(self._get_deferred(
+            self._get_room_connection_ready(soup, widgets, multiplexer)))
+        self.stopwatch.lap('inject')
+
+        rewritten_output = soup.encode_contents(formatter='html5').decode()
+        self.stopwatch.lap('serialize')
+        return rewritten_output
+
+    def _get_room_scope(self, url: str) -> str:
+        if self.config['room_scope'] == 'site':
+            return '/'
+        if self.config['room_scope'] == 'section':
+            if '/' not in url:
+                return '/'
+            return f'/{url.split("/")[0]}/'
+        return f'/{url}'
+
+    def _get_widgets(self, soup: bs4.BeautifulSoup, url: str, tags: typing.List[bs4.element.Tag]) -> list:
+        widgets = [
+            WIDGETS[tag.name](
+                self.config,
+                pathlib.PurePosixPath(url),
+                soup,
+                index,
+                tag,
+            )
+            for index, tag in enumerate(tags)
+        ]
+        if self.config['room_scope'] != 'page':
+            room_scope = self._get_room_scope(url)
+            occurrences = {}
+            for widget in widgets:
+                executor = widget.get_scoped_executor()
+                occurrences[executor] = occurrences.get(executor, 0) + 1
+                widget.set_room_scope(room_scope, occurrences[executor])
+        return widgets
+
+    def _get_monitor_multiplexer(self, soup: bs4.BeautifulSoup, url: str, widgets: list) -> typing.Optional[MonitorMultiplexer]:
+        monitor_widgets = [
+            widget
+            for widget in widgets
+            if isinstance(widget, MonitorWidget) and widget.is_multiplexable()
+        ]
+        if len(monitor_widgets) < 2:
+            return None
+        return MonitorMultiplexer(
+            self.config,
+            pathlib.PurePosixPath(url),
+            soup,
+            monitor_widgets,
+        )
+
+    def _get_page_configuration(self) -> dict:
+        return {
+            'type': self.config['backend_type'],
+            'logger_name_page': 'Page',
+            'logger_name_room_connection': 'RoomConnection',
+            'logger_name_room': f'{self.config["backend_type"].capitalize()}Room',
+            'executors': {},
+        }
+
+    def _add_widget(self, page_configuration: dict, widget):
+        if not isinstance(widget, MonitorWidget) or widget.multiplexer is None:
+            page_configuration['executors'][widget.name] = widget.get_backend_configuration(
+            )
+
+    def _get_head_tags(self, soup: bs4.BeautifulSoup, room_scope: str) -> typing.List[bs4.element.Tag]:
+        script_redirect = soup.new_tag('script')
+        if self.config['room_scope'] != 'page':
+            script_redirect.append(self._get_scoped_room_script(room_scope))
+        else:
+            script_redirect.append('''
+                const currentUrl = new URL(window.location);
+                const currentUrlSearchParams = new URLSearchParams(currentUrl.search);
+                const currentRoomName = currentUrlSearchParams.get("roomName");
+                // https://gist.github.com/johnelliott/cf77003f72f889abbc3f32785fa3df8d
+                if (currentRoomName === null || !currentRoomName.match(new RegExp(/^[0-9A-F]{8}-[0-9A-F]{4}-4[0-9A-F]{3}-[89AB][0-9A-F]{3}-[0-9A-F]{12}$/i))) {
+                    // https://gist.github.com/outbreak/316637cde245160c2579898b21837c1c
+                    const getRandomSymbol = (symbol) => {
+                        var array;
+                        if (symbol === "y") {
+                        array = ["8", "9", "a", "b"];
+                        return array[Math.floor(Math.random() * array.length)];
+                        }
+                        array = new Uint8Array(1);
+                        window.crypto.getRandomValues(array);
+                        return (array[0] % 16).toString(16);
+                    }
+                    const newRoomName = "xxxxxxxx-xxxx-4xxx-yxxx-xxxxxxxxxxxx".replace(/[xy]/g, getRandomSymbol);
+                    currentUrlSearchParams.set("roomName", newRoomName);
+                    currentUrl.search = currentUrlSearchParams;
+                    window.location.replace(currentUrl.toString());
+                }
+            ''')
+
+        return [script_redirect]
+
+    def _get_asset_tags(self, soup: bs4.BeautifulSoup, page_url: pathlib.PurePosixPath, widgets: list, multiplexer: typing.Optional[MonitorMultiplexer], existing_urls: set, static_files: set, bundles: dict) -> typing.List[bs4.element.Tag]:
+        page_assets = ['RoomConnection.js']
+        for widget in widgets:
+            page_assets += widget.get_assets()
+        if multiplexer is not None:
+            page_assets += multiplexer.get_assets()
+        assets = resolve_assets(page_assets)
+        static_files |= set(assets)
+
+        asset_tags = []
+        for asset in assets:
+            asset_url = os.path.relpath(f'/{asset}', page_url)
+            if asset_url in existing_urls:
+                continue
+            if asset.endswith('.css'):
+                asset_tag = soup.new_tag('link')
+                asset_tag['rel'] = 'stylesheet'
+                asset_tag['href'] = asset_url
+            else:
+                asset_tag = soup.new_tag('script')
+                asset_tag['src'] = asset_url
+                if self.config['script_loading'] == 'defer' and asset not in BLOCKING_ASSETS:
+                    asset_tag['defer'] = ''
+            asset_tags.append(asset_tag)
+        if self.config['bundle']:
+            asset_tags = self._bundle_tags(
+                soup, page_url, asset_tags, static_files, bundles)
+
+        preload_tags = []
+        if self.config['script_preload']:
+            for asset_tag in asset_tags:
+                if asset_tag.name == 'script' and asset_tag.has_attr('defer'):
+                    preload_tag = soup.new_tag('link')
+                    preload_tag['rel'] = 'preload'
+                    preload_tag['href'] = asset_tag['src']
+                    preload_tag['as'] = 'script'
+                    preload_tags.append(preload_tag)
+
+        return preload_tags + asset_tags
+
+    def _get_scoped_room_script(self, room_scope: str) -> str:
+        return f'''
+                const currentUrl = new URL(window.location);
+                const currentUrlSearchParams = new URLSearchParams(currentUrl.search);
+                const currentRoomScope = {json.dumps(room_scope)};
+                const currentRoomStorageKey = `interactive-widgets-room-name:${{currentRoomScope}}`;
+                // https://gist.github.com/johnelliott/cf77003f72f889abbc3f32785fa3df8d
+                const isRoomName = roomName => roomName !== null && new RegExp(/^[0-9A-F]{{8}}-[0-9A-F]{{4}}-4[0-9A-F]{{3}}-[89AB][0-9A-F]{{3}}-[0-9A-F]{{12}}$/i).test(roomName);
+                // https://gist.github.com/outbreak/316637cde245160c2579898b21837c1c
+                const getRandomSymbol = (symbol) => {{
+                    var array;
+                    if (symbol === "y") {{
+                    array = ["8", "9", "a", "b"];
+                    return array[Math.floor(Math.random() * array.length)];
+                    }}
+                    array = new Uint8Array(1);
+                    window.crypto.getRandomValues(array);
+                    return (array[0] % 16).toString(16);
+                }}
+                const currentRoomName = [
+                    currentUrlSearchParams.get("roomName"),
+                    window.sessionStorage.getItem(currentRoomStorageKey),
+                ].find(isRoomName) || "xxxxxxxx-xxxx-4xxx-yxxx-xxxxxxxxxxxx".replace(/[xy]/g, getRandomSymbol);
+                window.sessionStorage.setItem(currentRoomStorageKey, currentRoomName);
+                if (currentUrlSearchParams.get("roomName") !== currentRoomName) {{
+                    currentUrlSearchParams.set("roomName", currentRoomName);
+                    currentUrl.search = currentUrlSearchParams;
+                    window.history.replaceState(window.history.state, "", currentUrl.toString());
+                }}
+                document.addEventListener("DOMContentLoaded", () => {{
+                    for (const link of document.querySelectorAll("a[href]")) {{
+                        const linkUrl = new URL(link.href, currentUrl);
+                        if (linkUrl.origin === currentUrl.origin && linkUrl.pathname.startsWith(currentRoomScope)) {{
+                            linkUrl.searchParams.set("roomName", currentRoomName);
+                            link.href = linkUrl.toString();
+                        }}
+                    }}
+                }});
+            '''
+
+    def _bundle_tags(self, soup: bs4.BeautifulSoup, page_url: pathlib.PurePosixPath, tags: typing.List[bs4.element.Tag], static_files: set, bundles: dict) -> typing.List[bs4.element.Tag]:
+        replacements = {}
+        for name, attribute, rel, defer in [('script', 'src', None, False), ('script', 'src', None, True), ('link', 'href', 'stylesheet', False)]:
+            bundled_tags = {}
+            for tag in tags:
+                if tag.name != name or not tag.has_attr(attribute) or tag.get('rel') != rel or tag.has_attr('defer') != defer:
+                    continue
+                static_file = posixpath.normpath(posixpath.join(
+                    str(page_url),
+                    str(tag[attribute]),
+                ))[1:]
+                if (STATIC_DIRECTORY / static_file).is_file():
+                    bundled_tags.setdefault(static_file, []).append(tag)
+            if len(bundled_tags) == 0:
+                continue
+            bundled_files = tuple(bundled_tags.keys())
+            bundle_name = bundle.get_bundle_name(
+                bundled_files, self.config['bundle_minify'])
+            bundles[bundle_name] = list(bundled_files)
+            static_files -= set(bundled_files)
+            first_tag = next(iter(bundled_tags.values()))[0]
+            for tag in itertools.chain.from_iterable(bundled_tags.values()):
+                replacements[id(tag)] = None
+            replacements[id(first_tag)] = soup.new_tag(
+                name, attrs=dict(first_tag.attrs))
+            replacements[id(first_tag)][attribute] = os.path.relpath(
+                f'/{bundle_name}',
+                page_url,
+            )
+        bundled_tags = []
+        for tag in tags:
+            tag = replacements.get(id(tag), tag)
+            if tag is not None:
+                bundled_tags.append(tag)
+        return bundled_tags
+
+    def _get_room_connection_construction(self, soup: bs4.BeautifulSoup, widgets: list, multiplexer: typing.Optional[MonitorMultiplexer]) -> bs4.element.Tag:
+        script_room_connection_construction = soup.new_tag('script')
+        if self.config['websocket_binary_protocol']:
+            executors = [
+                widget.name
+                for widget in widgets
+                if not isinstance(widget, MonitorWidget) or widget.multiplexer is None
+            ]
+            if multiplexer is not None:
+                executors.append(multiplexer.name)
+            options = json.dumps({
+                'protocols': [BINARY_PROTOCOL],
+                'executors': executors,
+            })
+            script_room_connection_construction.append(
+                f'const roomConnection = new RoomConnection(currentRoomName, {options});',
+            )
+        else:
+            script_room_connection_construction.append(
+                'const roomConnection = new RoomConnection(currentRoomName);',
+            )
+        if multiplexer is not None:
+            script_room_connection_construction.append(
+                multiplexer.get_construction(),
+            )
+        return script_room_connection_construction
+
+    def _get_deferred(self, script: bs4.element.Tag) -> bs4.element.Tag:
+        if self.config['script_loading'] == 'defer':
+            script.string = f'document.addEventListener("DOMContentLoaded", () => {{{script.string}}});'
+        return script
+
+    def _get_manifest(self, soup: bs4.BeautifulSoup, widgets: list) -> bs4.element.Tag:
+        script_manifest = soup.new_tag('script')
+        script_manifest['type'] = 'application/json'
+        script_manifest['id'] = 'interactive-widgets-manifest'
+        manifest = json.dumps({
+            'widgets': [widget.get_manifest_entry() for widget in widgets],
+        }, separators=(',', ':'))
+        script_manifest.append(manifest.translate(MANIFEST_ESCAPES))
+        return script_manifest
+
+    def _get_room_connection_ready(self, soup: bs4.BeautifulSoup, widgets: list, multiplexer: typing.Optional[MonitorMultiplexer]) -> bs4.element.Tag:
+        widget_classes = ', '.join(dict.fromkeys(
+            type(widget).__name__ for widget in widgets))
+        arguments = [
+            'document.getElementById("interactive-widgets-manifest")',
+            f'{{ {widget_classes} }}' if len(widgets) > 0 else '{}',
+        ]
+        if multiplexer is not None:
+            arguments.append('monitorMultiplexer')
+        script_room_connection_ready = soup.new_tag('script')
+        script_room_connection_ready.append(
+            f'roomConnection.instantiateWidgets({", ".join(arguments)}); roomConnection.readyForConnecting();',
+        )
+        return script_room_connection_ready
+
+
+def contains_widgets(markup: str) -> bool:
+    pattern = '|'.join(re.escape(name) for name in WIDGETS.keys())
+    return re.search(f'<(?:{pattern})[\\t\\n\\r\\f />]', markup, re.IGNORECASE) is not None
+
+
+def rewrite_page(config: dict, output: str, url: str, name: str) -> typing.Optional[dict]:
+    return PageRewriter(config).rewrite(output, url, name)
@@ -0,0 +1,59 @@
+import hashlib
+import json
+import pathlib
+
+
+SHARD_DIRECTORY = 'interactive-widgets-backend'
+SHARD_KINDS = ['executors', 'pages']
+
+
+class ShardWriter:
+
+    def __init__(self, directory: pathlib.Path):
+        self.directory = directory
+        self.used = set()
+        self.written_files = 0
+        self.written_bytes = 0
+        self.skipped_files = 0
+        self.removed_files = 0
+
+    def _write_shard(self, kind: str, data: dict, sort_keys: bool) -> str:
+        contents = json.dumps(
+            data, sort_keys=sort_keys, separators=(',', ':')).encode('utf-8')
+        name = f'{kind}/{hashlib.sha256(contents).hexdigest()[:16]}.json'
+        if name in self.used:
+            return name
+        self.used.add(name)
+        path = self.directory / name
+        if path.is_file():
+            self.skipped_files += 1
+            return name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary_path = path.with_suffix('.tmp')
+        temporary_path.write_bytes(contents)
+        temporary_path.replace(path)
+        self.written_files += 1
+        self.written_bytes += len(contents)
+        return name
+
+    def write(self, backend_configuration: dict):
+        pages = {}
+        for page_url, page in backend_configuration['pages'].items():
+            pages[page_url] = self._write_shard('pages', dict(page, executors={
+                name: self._write_shard('executors', executor, True)
+                for name, executor in page['executors'].items()
+            }), False)
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        temporary_path = self.directory / 'index.tmp'
+        with temporary_path.open('w') as f:
+            json.dump(dict(backend_configuration, pages=pages), f, indent=2)
+        temporary_path.replace(self.directory / 'index.json')
+
+        for kind in SHARD_KINDS:
+            if not (self.directory / kind).is_dir():
+                continue
+            for path in (self.directory / kind).iterdir():
+                if f'{kind}/{path.name}' not in self.used:
+                    path.unlink()
+                    self.removed_files += 1
@@ -1,13 +1,12 @@
 class ButtonWidget extends Widget {
-  constructor(element, command, label) {
+  constructor(element, command, label, maxOutputLines) {
     super();
     this.element = element;
     this.command = command;
     this.label = label;
+    this.maxOutputLines = maxOutputLines;
     this.open = false;
     this.running = false;
-    this.stdoutBuffer = "";
-    this.stderrBuffer = "";
   }
 
   start() {
@@ -42,6 +41,7 @@ class ButtonWidget extends Widget {
     this.outputsElement = document.createElement("div");
     this.boxElement.appendChild(this.outputsElement);
     this.outputsElement.classList.add("outputs");
+    this.outputLog = new OutputLog(this.outputsElement, this.maxOutputLines);
   }
 
   handleOpen() {
@@ -57,42 +57,21 @@ class ButtonWidget extends Widget {
   handleMessage(message) {
     switch (message.type) {
       case "started": {
+        this.resetDecoders();
         this.running = true;
         this.buttonElement.disabled = !this.open || this.running;
-        while (this.outputsElement.firstChild) {
-          this.outputsElement.removeChild(this.outputsElement.firstChild);
-        }
+        this.outputLog.clear();
         this.boxElement.classList.add("empty");
         this.outputsElement.classList.remove("show");
         break;
       }
       case "output": {
+        this.boxElement.classList.remove("empty");
+        this.outputsElement.classList.add("show");
         if ("stdout" in message) {
-          this.stdoutBuffer += this.atob(message.stdout);
-          for (let newlinePosition = this.stdoutBuffer.indexOf("\n"); newlinePosition !== -1; newlinePosition = this.stdoutBuffer.indexOf("\n")) {
-            const currentLine = this.stdoutBuffer.substr(0, newlinePosition);
-            this.boxElement.classList.remove("empty");
-            this.outputsElement.classList.add("show");
-            const lineElement = document.createElement("pre");
-            lineElement.classList.add("line", "stdout");
-            console.log(currentLine);
-            lineElement.innerText = currentLine;
-            this.outputsElement.appendChild(lineElement);
-            this.stdoutBuffer = this.stdoutBuffer.substr(newlinePosition + 1, this.stdoutBuffer.length - newlinePosition - 1);
-          }
+          this.outputLog.append("stdout", this.decode(message.stdout, "stdout"));
         } else if ("stderr" in message) {
-          this.stderrBuffer += this.atob(message.stderr);
-          for (let newlinePosition = this.stderrBuffer.indexOf("\n"); newlinePosition !== -1; newlinePosition = this.stderrBuffer.indexOf("\n")) {
-            const currentLine = this.stderrBuffer.substr(0, newlinePosition);
-            this.boxElement.classList.remove("empty");
-            this.outputsElement.classList.add("show");
-            const lineElement = document.createElement("pre");
-            lineElement.classList.add("line", "stderr");
-            console.log(currentLine);
-            lineElement.innerText = currentLine;
-            this.outputsElement.appendChild(lineElement);
-            this.stderrBuffer = this.stderrBuffer.substr(newlinePosition + 1, this.stderrBuffer.length - newlinePosition - 1);
-          }
+          this.outputLog.append("stderr", this.decode(message.stderr, "stderr"));
         }
         break;
       }
@@ -106,10 +85,7 @@ class ButtonWidget extends Widget {
         this.buttonElement.disabled = !this.open || this.running;
         this.boxElement.classList.remove("empty");
         this.outputsElement.classList.add("show");
-        const errorElement = document.createElement("div");
-        errorElement.classList.add("error");
-        errorElement.innerText = this.atob(message.stdout);
-        this.outputsElement.appendChild(errorElement);
+        this.outputLog.append("error", `${this.decode(message.stdout)}\n`);
         break;
       }
     }
@@ -1,9 +1,10 @@
 class EpilogueWidget extends Widget {
-  constructor(element, command, hidden) {
+  constructor(element, command, hidden, maxOutputLines) {
     super();
     this.element = element;
     this.command = command;
     this.hidden = hidden;
+    this.maxOutputLines = maxOutputLines;
   }
 
   start() {
@@ -25,6 +26,7 @@ class EpilogueWidget extends Widget {
       this.outputsElement = document.createElement("div");
       this.boxElement.appendChild(this.outputsElement);
       this.outputsElement.classList.add("outputs");
+      this.outputLog = new OutputLog(this.outputsElement, this.maxOutputLines);
 
       this.captionElement = document.createElement("div");
       this.element.appendChild(this.captionElement);
@@ -37,28 +39,19 @@ class EpilogueWidget extends Widget {
     if (!this.hidden) {
       switch (message.type) {
         case "started": {
-          while (this.outputsElement.firstChild) {
-            this.outputsElement.removeChild(this.outputsElement.firstChild);
-          }
+          this.resetDecoders();
+          this.outputLog.clear();
           this.boxElement.classList.add("empty");
           this.outputsElement.classList.remove("show");
           break;
         }
         case "output": {
+          this.boxElement.classList.remove("empty");
+          this.outputsElement.classList.add("show");
           if ("stdout" in message) {
-            this.boxElement.classList.remove("empty");
-            this.outputsElement.classList.add("show");
-            const lineElement = document.createElement("div");
-            lineElement.classList.add("line", "stdout");
-            lineElement.innerText = this.atob(message.stdout);
-            this.outputsElement.appendChild(lineElement);
+            this.outputLog.append("stdout", this.decode(message.stdout, "stdout"));
           } else if ("stderr" in message) {
-            this.boxElement.classList.remove("empty");
-            this.outputsElement.classList.add("show");
-            const lineElement = document.createElement("div");
-            lineElement.classList.add("line", "stderr");
-            lineElement.innerText = this.atob(message.stderr);
-            this.outputsElement.appendChild(lineElement);
+            this.outputLog.append("stderr", this.decode(message.stderr, "stderr"));
           }
           break;
         }
@@ -68,10 +61,7 @@ class EpilogueWidget extends Widget {
         case "errored": {
           this.boxElement.classList.remove("empty");
           this.outputsElement.classList.add("show");
-          const errorElement = document.createElement("div");
-          errorElement.classList.add("error");
-          errorElement.innerText = this.atob(message.stdout);
-          this.outputsElement.appendChild(errorElement);
+          this.outputLog.append("error", `${this.decode(message.stdout)}\n`);
           break;
         }
       }
@@ -5,6 +5,8 @@ class ImageViewerWidget extends Widget {
     this.file = file;
     this.mime = mime;
     this.stdoutBuffer = "";
+    this.contents = null;
+    this.objectUrl = null;
   }
 
   start() {
@@ -47,14 +49,35 @@ class ImageViewerWidget extends Widget {
   }
 
   setupError(error) {
+    this.contents = null;
     this.boxElement.style.backgroundImage = "none";
+    this.revokeObjectUrl();
     this.errorElement.classList.add("show");
     this.spanElement.innerText = this.atob(error);
   }
 
   setupContents(contents) {
+    if (contents === this.contents) {
+      return;
+    }
+    this.contents = contents;
+    const binary = atob(contents);
+    const bytes = new Uint8Array(binary.length);
+    for (let index = 0; index < binary.length; index++) {
+      bytes[index] = binary.charCodeAt(index);
+    }
+    const objectUrl = URL.createObjectURL(new Blob([bytes], { type: this.mime }));
     this.errorElement.classList.remove("show");
-    this.boxElement.style.backgroundImage = `url(data:${this.mime};base64,${contents})`;
+    this.boxElement.style.backgroundImage = `url("${objectUrl}")`;
+    this.revokeObjectUrl();
+    this.objectUrl = objectUrl;
+  }
+
+  revokeObjectUrl() {
+    if (this.objectUrl !== null) {
+      URL.revokeObjectURL(this.objectUrl);
+      this.objectUrl = null;
+    }
   }
 
   handleMessage(message) {
@@ -68,7 +91,7 @@ class ImageViewerWidget extends Widget {
       return;
     }
 
-    this.stdoutBuffer += this.atob(message.stdout);
+    this.stdoutBuffer += this.decode(message.stdout, "stdout");
     for (let newlinePosition = this.stdoutBuffer.indexOf("\n"); newlinePosition != -1; newlinePosition = this.stdoutBuffer.indexOf("\n")) {
       const stdoutMessage = JSON.parse(this.stdoutBuffer.slice(0, newlinePosition));
       if ("contents" in stdoutMessage) {
@@ -0,0 +1,63 @@
+class MonitorMultiplexer extends EventTarget {
+  constructor(roomConnection, executor) {
+    super();
+    this.roomConnection = roomConnection;
+    this.executor = executor;
+    this.encoder = new TextEncoder();
+    this.stdoutDecoder = new TextDecoder();
+    this.stdoutBuffer = "";
+    this.stdinDecoders = new Map();
+    this.stdinBuffers = new Map();
+    this.roomConnection.addEventListener("connect", event => {
+      if (!event.detail.resumed) {
+        this.stdoutDecoder = new TextDecoder();
+        this.stdoutBuffer = "";
+      }
+    });
+    this.roomConnection.addEventListener(this.executor, event => {
+      this.handleMessage(event.detail);
+    });
+  }
+
+  handleMessage(message) {
+    if (message.type != "output" || !("stdout" in message)) {
+      console.warn("Message type not implemented:", message);
+      return;
+    }
+
+    this.stdoutBuffer += this.stdoutDecoder.decode(message.stdout, { stream: true });
+    for (let newlinePosition = this.stdoutBuffer.indexOf("\n"); newlinePosition != -1; newlinePosition = this.stdoutBuffer.indexOf("\n")) {
+      const { widget, ...stdoutMessage } = JSON.parse(this.stdoutBuffer.slice(0, newlinePosition));
+      this.stdoutBuffer = this.stdoutBuffer.slice(newlinePosition + 1);
+      this.dispatchEvent(new CustomEvent(widget, {
+        detail: {
+          type: "output",
+          stdout: this.encoder.encode(`${JSON.stringify(stdoutMessage)}\n`),
+        },
+      }));
+    }
+  }
+
+  sendMessage(widget, message) {
+    if (message === null || !("stdin" in message)) {
+      return;
+    }
+
+    if (!this.stdinDecoders.has(widget)) {
+      this.stdinDecoders.set(widget, new TextDecoder());
+      this.stdinBuffers.set(widget, "");
+    }
+    let stdinBuffer = this.stdinBuffers.get(widget) + this.stdinDecoders.get(widget).decode(message.stdin, { stream: true });
+    const lines = [];
+    for (let newlinePosition = stdinBuffer.indexOf("\n"); newlinePosition != -1; newlinePosition = stdinBuffer.indexOf("\n")) {
+      lines.push(`${JSON.stringify({ widget: widget, ...JSON.parse(stdinBuffer.slice(0, newlinePosition)) })}\n`);
+      stdinBuffer = stdinBuffer.slice(newlinePosition + 1);
+    }
+    this.stdinBuffers.set(widget, stdinBuffer);
+    if (lines.length > 0) {
+      this.roomConnection.sendMessage(this.executor, {
+        stdin: this.encoder.encode(lines.join("")),
+      });
+    }
+  }
+}
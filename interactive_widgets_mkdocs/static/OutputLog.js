@@ -0,0 +1,163 @@
+class OutputLog {
+  constructor(element, maxLines, visibleLines = 20, overscanLines = 10) {
+    this.element = element;
+    this.maxLines = maxLines;
+    this.visibleLines = visibleLines;
+    this.overscanLines = overscanLines;
+    this.lines = new Array(maxLines);
+    this.firstLine = 0;
+    this.lineCount = 0;
+    this.droppedLines = 0;
+    this.lineHeight = null;
+    this.followOutput = true;
+    this.renderScheduled = false;
+
+    this.droppedElement = document.createElement("div");
+    this.element.appendChild(this.droppedElement);
+    this.droppedElement.classList.add("line", "dropped");
+    this.droppedElement.style.display = "none";
+
+    this.viewportElement = document.createElement("div");
+    this.element.appendChild(this.viewportElement);
+    this.viewportElement.style.overflow = "auto";
+    this.viewportElement.addEventListener("scroll", () => {
+      if (this.lineHeight !== null) {
+        this.followOutput = this.viewportElement.scrollTop + this.viewportElement.clientHeight >= this.viewportElement.scrollHeight - this.lineHeight;
+      }
+      this.scheduleRender();
+    });
+
+    this.spacerElement = document.createElement("div");
+    this.viewportElement.appendChild(this.spacerElement);
+    this.spacerElement.style.position = "relative";
+
+    this.windowElement = document.createElement("div");
+    this.spacerElement.appendChild(this.windowElement);
+    this.windowElement.style.position = "absolute";
+    this.windowElement.style.top = "0";
+    this.windowElement.style.left = "0";
+    this.windowElement.style.right = "0";
+  }
+
+  getLine(index) {
+    return this.lines[(this.firstLine + index) % this.maxLines];
+  }
+
+  pushLine(line) {
+    if (this.lineCount === this.maxLines) {
+      this.lines[this.firstLine] = line;
+      this.firstLine = (this.firstLine + 1) % this.maxLines;
+      this.droppedLines += 1;
+    } else {
+      this.lines[(this.firstLine + this.lineCount) % this.maxLines] = line;
+      this.lineCount += 1;
+    }
+  }
+
+  append(stream, text) {
+    const segments = text.split("\n");
+    for (let index = 0; index < segments.length; index++) {
+      const complete = index < segments.length - 1;
+      if (!complete && segments[index] === "") {
+        break;
+      }
+      const lastLine = this.lineCount > 0 ? this.getLine(this.lineCount - 1) : null;
+      if (lastLine !== null && lastLine.stream === stream && !lastLine.complete) {
+        lastLine.text += segments[index];
+        lastLine.complete = complete;
+      } else {
+        this.pushLine({ stream: stream, text: segments[index], complete: complete });
+      }
+    }
+    this.scheduleRender();
+  }
+
+  clear() {
+    this.lines = new Array(this.maxLines);
+    this.firstLine = 0;
+    this.lineCount = 0;
+    this.droppedLines = 0;
+    this.followOutput = true;
+    this.scheduleRender();
+  }
+
+  scheduleRender() {
+    if (!this.renderScheduled) {
+      this.renderScheduled = true;
+      window.requestAnimationFrame(() => this.render());
+    }
+  }
+
+  createRunElement(stream) {
+    const runElement = document.createElement(stream === "error" ? "div" : "pre");
+    if (stream === "error") {
+      runElement.classList.add("error");
+    } else {
+      runElement.classList.add("line", stream);
+    }
+    runElement.style.whiteSpace = "pre";
+    runElement.style.margin = "0";
+    return runElement;
+  }
+
+  measureLineHeight() {
+    const probeElement = this.createRunElement("stdout");
+    this.windowElement.appendChild(probeElement);
+    probeElement.innerText = " ";
+    const lineHeight = probeElement.getBoundingClientRect().height;
+    this.windowElement.removeChild(probeElement);
+    if (lineHeight > 0) {
+      this.lineHeight = lineHeight;
+      this.viewportElement.style.maxHeight = `${this.visibleLines * lineHeight}px`;
+    }
+  }
+
+  render() {
+    this.renderScheduled = false;
+
+    this.droppedElement.style.display = this.droppedLines > 0 ? "" : "none";
+    this.droppedElement.innerText = `${this.droppedLines} earlier lines dropped`;
+
+    if (this.lineHeight === null) {
+      this.measureLineHeight();
+      if (this.lineHeight === null) {
+        return;
+      }
+    }
+
+    this.spacerElement.style.height = `${this.lineCount * this.lineHeight}px`;
+    if (this.followOutput) {
+      this.viewportElement.scrollTop = this.viewportElement.scrollHeight;
+    }
+
+    const scrollTop = this.viewportElement.scrollTop;
+    const clientHeight = this.viewportElement.clientHeight;
+    const first = Math.max(0, Math.floor(scrollTop / this.lineHeight) - this.overscanLines);
+    const last = Math.min(this.lineCount, Math.ceil((scrollTop + clientHeight) / this.lineHeight) + this.overscanLines);
+
+    while (this.windowElement.firstChild) {
+      this.windowElement.removeChild(this.windowElement.firstChild);
+    }
+    this.windowElement.style.transform = `translateY(${first * this.lineHeight}px)`;
+
+    let runStream = null;
+    let runLines = [];
+    const flushRun = () => {
+      if (runLines.length > 0) {
+        const runElement = this.createRunElement(runStream);
+        runElement.textContent = `${runLines.join("\n")}\n`;
+        this.windowElement.appendChild(runElement);
+      }
+    };
+    for (let index = first; index < last; index++) {
+      const line = this.getLine(index);
+      if (line.stream !== runStream) {
+        flushRun();
+        runStream = line.stream;
+        runLines = [];
+      }
+      runLines.push(line.text);
+    }
+    flushRun();
+  }
+}
@@ -1,16 +1,33 @@
+const BINARY_PROTOCOL = "interactive-widgets.binary.v2";
+const BINARY_HEADER_LENGTH = 7;
+const BINARY_CHANNEL_CONTROL = 0;
+const BINARY_CHANNEL_STDOUT = 1;
+const BINARY_CHANNEL_STDERR = 2;
+const BINARY_CHANNEL_STDIN = 3;
+const RECONNECT_INITIAL_DELAY = 500;
+const RECONNECT_MAX_DELAY = 30000;
+
 class RoomConnection extends EventTarget {
-  constructor(roomName) {
+  constructor(roomName, options = {}) {
     super();
     this.roomName = roomName;
+    this.protocols = options.protocols || [];
+    this.executors = options.executors || [];
+    this.executorIndices = new Map(this.executors.map((executor, index) => [executor, index]));
     this.pendingLoadingWidgets = 0;
     this.enableConnecting = false;
     this.messageQueue = [];
+    this.startedExecutors = new Set();
+    this.sequences = new Map();
+    this.reconnectAttempts = 0;
+    this.reconnectTimeout = null;
     this.disconnectedElement = null;
     this.webSocket = null;
   }
 
   connect() {
-    this.webSocket = new WebSocket(this.getWebSocketUrl());
+    this.webSocket = new WebSocket(this.getWebSocketUrl(), this.protocols);
+    this.webSocket.binaryType = "arraybuffer";
     this.webSocket.addEventListener("open", this.handleOpen.bind(this));
     this.webSocket.addEventListener("message", this.handleMessage.bind(this));
     this.webSocket.addEventListener("close", this.handleClose.bind(this));
@@ -34,22 +51,132 @@ class RoomConnection extends EventTarget {
   }
 
   handleOpen() {
+    this.reconnectAttempts = 0;
     this.showConnected();
-    this.dispatchEvent(new Event("connect"));
-    for (let message = this.messageQueue.pop(); message !== undefined; message = this.messageQueue.pop()) {
-      this.webSocket.send(JSON.stringify(message));
+    this.dispatchEvent(new CustomEvent("connect", { detail: { resumed: this.sequences.size > 0 } }));
+    for (const [executor, sequence] of this.sequences) {
+      this.send(executor, { replay: sequence });
+    }
+    for (const executor of this.startedExecutors) {
+      this.send(executor, { start: true });
+    }
+    const messageQueue = this.messageQueue;
+    this.messageQueue = [];
+    for (const message of messageQueue) {
+      this.send(message.executor, message.message);
+    }
+  }
+
+  trackSequence(executor, sequence) {
+    if (sequence !== undefined && sequence !== 0) {
+      this.sequences.set(executor, sequence);
     }
   }
 
   handleMessage(event) {
-    const message = JSON.parse(event.data);
-    this.dispatchEvent(new CustomEvent(message.executor, { detail: message.message }));
+    if (typeof event.data === "string") {
+      const message = JSON.parse(event.data);
+      this.trackSequence(message.executor, message.sequence);
+      this.dispatchEvent(new CustomEvent(message.executor, { detail: this.decodeMessage(message.message) }));
+      return;
+    }
+
+    const view = new DataView(event.data);
+    const executor = this.executors[view.getUint16(0)];
+    if (executor === undefined) {
+      console.warn("Executor index not in binary protocol executors, dropping frame:", view.getUint16(0));
+      return;
+    }
+    this.trackSequence(executor, view.getUint32(3));
+    const payload = new Uint8Array(event.data, BINARY_HEADER_LENGTH);
+    let message;
+    switch (view.getUint8(2)) {
+      case BINARY_CHANNEL_CONTROL: {
+        message = this.decodeMessage(JSON.parse(new TextDecoder().decode(payload)));
+        break;
+      }
+      case BINARY_CHANNEL_STDOUT: {
+        message = { type: "output", stdout: payload };
+        break;
+      }
+      case BINARY_CHANNEL_STDERR: {
+        message = { type: "output", stderr: payload };
+        break;
+      }
+      default: {
+        console.warn("Binary channel not implemented:", view.getUint8(2));
+        return;
+      }
+    }
+    this.dispatchEvent(new CustomEvent(executor, { detail: message }));
+  }
+
+  decodeMessage(message) {
+    if (message !== null && typeof message === "object") {
+      for (const key of ["stdout", "stderr"]) {
+        if (typeof message[key] === "string") {
+          message[key] = this.decodeBase64(message[key]);
+        }
+      }
+    }
+    return message;
+  }
+
+  decodeBase64(data) {
+    const binary = atob(data);
+    const bytes = new Uint8Array(binary.length);
+    for (let index = 0; index < binary.length; index++) {
+      bytes[index] = binary.charCodeAt(index);
+    }
+    return bytes;
+  }
+
+  encodeBase64(bytes) {
+    const chunks = [];
+    for (let index = 0; index < bytes.length; index += 0x8000) {
+      chunks.push(String.fromCharCode.apply(null, bytes.subarray(index, index + 0x8000)));
+    }
+    return btoa(chunks.join(""));
+  }
+
+  send(executor, message) {
+    if (this.webSocket.protocol !== BINARY_PROTOCOL) {
+      if (message !== null && message.stdin instanceof Uint8Array) {
+        message = { ...message, stdin: this.encodeBase64(message.stdin) };
+      }
+      this.webSocket.send(JSON.stringify({
+        executor: executor,
+        message: message,
+      }));
+      return;
+    }
+
+    const executorIndex = this.executorIndices.get(executor);
+    if (executorIndex === undefined) {
+      console.warn("Executor not in binary protocol executors, dropping message:", executor, message);
+      return;
+    }
+    let channel = BINARY_CHANNEL_CONTROL;
+    let payload;
+    if (message !== null && message.stdin instanceof Uint8Array) {
+      channel = BINARY_CHANNEL_STDIN;
+      payload = message.stdin;
+    } else {
+      payload = new TextEncoder().encode(JSON.stringify(message));
+    }
+    const frame = new Uint8Array(BINARY_HEADER_LENGTH + payload.length);
+    const view = new DataView(frame.buffer);
+    view.setUint16(0, executorIndex);
+    view.setUint8(2, channel);
+    frame.set(payload, BINARY_HEADER_LENGTH);
+    this.webSocket.send(frame);
   }
 
   handleClose(event) {
     this.showDisconnected();
     console.warn("WEBSOCKET CLOSED!!11elf", event);
     this.dispatchEvent(new Event("disconnect"));
+    this.scheduleReconnect();
   }
 
   handleError(event) {
@@ -58,6 +185,18 @@ class RoomConnection extends EventTarget {
     this.dispatchEvent(new Event("disconnect"));
   }
 
+  scheduleReconnect() {
+    if (this.reconnectTimeout !== null) {
+      return;
+    }
+    const maxDelay = Math.min(RECONNECT_MAX_DELAY, RECONNECT_INITIAL_DELAY * 2 ** this.reconnectAttempts);
+    this.reconnectAttempts += 1;
+    this.reconnectTimeout = window.setTimeout(() => {
+      this.reconnectTimeout = null;
+      this.connect();
+    }, Math.random() * maxDelay);
+  }
+
   addWidget() {
     this.pendingLoadingWidgets += 1;
   }
@@ -76,16 +215,76 @@ class RoomConnection extends EventTarget {
     }
   }
 
-  sendMessage(executor, message) {
-    const completeMessage = {
-      executor: executor,
-      message: message,
+  instantiateWidgets(manifestElement, widgetClasses, monitorMultiplexer = null) {
+    const manifest = JSON.parse(manifestElement.textContent);
+    for (const entry of manifest.widgets) {
+      const element = document.getElementById(entry.element);
+      const connection = entry.multiplexed ? monitorMultiplexer : this;
+      this.addWidget();
+      const widget = new widgetClasses[entry.type](element, ...entry.parameters);
+      const readyListener = () => {
+        this.markWidgetReady();
+        widget.removeEventListener("ready", readyListener);
+      };
+      widget.addEventListener("ready", readyListener);
+      widget.addEventListener("message", event => {
+        connection.sendMessage(entry.name, event.detail);
+      });
+      if (typeof widget.handleOpen === "function") {
+        this.addEventListener("connect", event => {
+          widget.handleOpen();
+        });
+      }
+      if (typeof widget.handleClose === "function") {
+        this.addEventListener("disconnect", event => {
+          widget.handleClose();
+        });
+      }
+      connection.addEventListener(entry.name, event => {
+        widget.handleMessage(event.detail);
+      });
+      widget.start();
+      if (entry.start === "on-demand") {
+        this.startOnDemand(entry.name, element);
+      }
+    }
+  }
+
+  startOnDemand(executor, element) {
+    const start = () => {
+      this.startedExecutors.add(executor);
+      if (this.webSocket !== null && this.webSocket.readyState === 1) {
+        this.send(executor, { start: true });
+      }
     };
+    if (typeof IntersectionObserver === "undefined") {
+      start();
+      return;
+    }
+
+    const placeholderElement = document.createElement("div");
+    element.insertBefore(placeholderElement, element.firstChild);
+    placeholderElement.classList.add("interactive-widgets-placeholder");
+    placeholderElement.innerText = "Starts when scrolled into view";
 
+    const observer = new IntersectionObserver(entries => {
+      if (entries.some(entry => entry.isIntersecting)) {
+        observer.disconnect();
+        element.removeChild(placeholderElement);
+        start();
+      }
+    });
+    observer.observe(element);
+  }
+
+  sendMessage(executor, message) {
     if (this.webSocket !== null && this.webSocket.readyState === 1) {
-      this.webSocket.send(JSON.stringify(completeMessage));
+      this.send(executor, message);
     } else {
-      this.messageQueue.push(completeMessage);
+      this.messageQueue.push({
+        executor: executor,
+        message: message,
+      });
     }
   }
 
@@ -114,7 +313,7 @@ class RoomConnection extends EventTarget {
 
       const disconnectedSpanElement = document.createElement("span");
       disconnectedBoxElement.appendChild(disconnectedSpanElement);
-      disconnectedSpanElement.innerText = "Connection lost. Please reload.";
+      disconnectedSpanElement.innerText = "Connection lost. Reconnecting...";
     }
   }
 
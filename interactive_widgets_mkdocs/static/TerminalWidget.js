@@ -1,9 +1,15 @@
 class TerminalWidget extends Widget {
-  constructor(element, command, workingDirectory) {
+  constructor(element, command, workingDirectory, highWatermark, lowWatermark) {
     super();
     this.element = element;
     this.command = command;
     this.workingDirectory = workingDirectory;
+    this.highWatermark = highWatermark;
+    this.lowWatermark = lowWatermark;
+    this.pendingChunks = [];
+    this.pendingBytes = 0;
+    this.flushScheduled = false;
+    this.paused = false;
   }
 
   start() {
@@ -74,7 +80,7 @@ class TerminalWidget extends Widget {
     this.terminal.onData(data => {
       this.dispatchEvent(new CustomEvent("message", {
         detail: {
-          stdin: this.btoa(data),
+          stdin: this.encode(data),
         },
       }));
     });
@@ -100,6 +106,48 @@ class TerminalWidget extends Widget {
   }
 
   handleMessage(message) {
-    this.terminal.write(this.atob(message.stdout));
+    this.pendingChunks.push(message.stdout);
+    this.pendingBytes += message.stdout.length;
+    this.updateFlowControl();
+    if (!this.flushScheduled) {
+      this.flushScheduled = true;
+      window.requestAnimationFrame(() => this.flush());
+    }
+  }
+
+  flush() {
+    this.flushScheduled = false;
+    let data = this.pendingChunks[0];
+    if (this.pendingChunks.length > 1) {
+      data = new Uint8Array(this.pendingChunks.reduce((length, chunk) => length + chunk.length, 0));
+      let offset = 0;
+      for (const chunk of this.pendingChunks) {
+        data.set(chunk, offset);
+        offset += chunk.length;
+      }
+    }
+    this.pendingChunks = [];
+    this.terminal.write(data, () => {
+      this.pendingBytes -= data.length;
+      this.updateFlowControl();
+    });
+  }
+
+  updateFlowControl() {
+    if (!this.paused && this.pendingBytes > this.highWatermark) {
+      this.paused = true;
+      this.dispatchEvent(new CustomEvent("message", {
+        detail: {
+          flow: "pause",
+        },
+      }));
+    } else if (this.paused && this.pendingBytes < this.lowWatermark) {
+      this.paused = false;
+      this.dispatchEvent(new CustomEvent("message", {
+        detail: {
+          flow: "resume",
+        },
+      }));
+    }
   }
 }
@@ -5,6 +5,8 @@ class TextEditorWidget extends Widget {
     this.file = file;
     this.mode = mode;
     this.stdoutBuffer = "";
+    this.contents = "";
+    this.version = null;
     this.open = false;
     this.running = false;
     this.hasContents = false;
@@ -32,7 +34,7 @@ class TextEditorWidget extends Widget {
       if (this.open) {
         this.dispatchEvent(new CustomEvent("message", {
           detail: {
-            stdin: this.btoa(JSON.stringify({
+            stdin: this.encode(JSON.stringify({
               contents: "",
             }) + "\n"),
           },
@@ -52,10 +54,14 @@ class TextEditorWidget extends Widget {
     this.buttonSaveElement.innerText = "Save";
     this.buttonSaveElement.addEventListener("click", () => {
       if (this.open) {
+        const contents = this.editor.getValue();
         this.dispatchEvent(new CustomEvent("message", {
           detail: {
-            stdin: this.btoa(JSON.stringify({
-              contents: this.btoa(this.editor.getValue()),
+            stdin: this.encode(JSON.stringify(this.version === null ? {
+              contents: this.btoa(contents),
+            } : {
+              base: this.version,
+              ...this.diffText(this.contents, contents),
             }) + "\n"),
           },
         }));
@@ -76,7 +82,7 @@ class TextEditorWidget extends Widget {
       if (this.open) {
         this.dispatchEvent(new CustomEvent("message", {
           detail: {
-            stdin: this.btoa(JSON.stringify({
+            stdin: this.encode(JSON.stringify({
               delete: true,
             }) + "\n"),
           },
@@ -134,16 +140,48 @@ class TextEditorWidget extends Widget {
     this.spanElement.innerText = this.atob(error);
   }
 
-  setupContents(contents) {
+  setupContents(contents, version) {
     this.running = false;
     this.hasContents = true;
     this.updateDisabled();
     this.errorElement.classList.remove("show");
     this.editorElement.classList.add("show");
-    this.editor.setValue(this.atob(contents));
+    this.contents = this.atob(contents);
+    this.version = version;
+    const scrollInfo = this.editor.getScrollInfo();
+    this.editor.setValue(this.contents);
+    this.editor.scrollTo(scrollInfo.left, scrollInfo.top);
     this.editor.refresh();
   }
 
+  applyPatch(patch) {
+    if (this.version === null || patch.base !== this.version) {
+      this.dispatchEvent(new CustomEvent("message", {
+        detail: {
+          stdin: this.encode(JSON.stringify({
+            resync: true,
+          }) + "\n"),
+        },
+      }));
+      return;
+    }
+    this.running = false;
+    this.hasContents = true;
+    this.updateDisabled();
+    this.errorElement.classList.remove("show");
+    this.editorElement.classList.add("show");
+    const modified = this.editor.getValue() !== this.contents;
+    this.contents = this.contents.slice(0, patch.from) + patch.text + this.contents.slice(patch.to);
+    this.version = patch.version;
+    if (modified) {
+      const scrollInfo = this.editor.getScrollInfo();
+      this.editor.setValue(this.contents);
+      this.editor.scrollTo(scrollInfo.left, scrollInfo.top);
+    } else {
+      this.editor.replaceRange(patch.text, this.editor.posFromIndex(patch.from), this.editor.posFromIndex(patch.to));
+    }
+  }
+
   handleOpen() {
     this.open = true;
     this.updateDisabled();
@@ -172,11 +210,13 @@ class TextEditorWidget extends Widget {
       return;
     }
 
-    this.stdoutBuffer += this.atob(message.stdout);
+    this.stdoutBuffer += this.decode(message.stdout, "stdout");
     for (let newlinePosition = this.stdoutBuffer.indexOf("\n"); newlinePosition != -1; newlinePosition = this.stdoutBuffer.indexOf("\n")) {
       const stdoutMessage = JSON.parse(this.stdoutBuffer.slice(0, newlinePosition));
       if ("contents" in stdoutMessage) {
-        this.setupContents(stdoutMessage.contents);
+        this.setupContents(stdoutMessage.contents, "version" in stdoutMessage ? stdoutMessage.version : null);
+      } else if ("base" in stdoutMessage) {
+        this.applyPatch(stdoutMessage);
       } else if ("error" in stdoutMessage) {
         this.setupError(stdoutMessage.error);
       }
@@ -5,6 +5,8 @@ class TextViewerWidget extends Widget {
     this.file = file;
     this.mode = mode;
     this.stdoutBuffer = "";
+    this.contents = "";
+    this.version = null;
   }
 
   start() {
@@ -63,13 +65,35 @@ class TextViewerWidget extends Widget {
     this.spanElement.innerText = this.atob(error);
   }
 
-  setupContents(contents) {
+  setupContents(contents, version) {
     this.viewerElement.classList.add("show");
     this.errorElement.classList.remove("show");
-    this.editor.setValue(this.atob(contents));
+    this.contents = this.atob(contents);
+    this.version = version;
+    const scrollInfo = this.editor.getScrollInfo();
+    this.editor.setValue(this.contents);
+    this.editor.scrollTo(scrollInfo.left, scrollInfo.top);
     this.editor.refresh();
   }
 
+  applyPatch(patch) {
+    if (this.version === null || patch.base !== this.version) {
+      this.dispatchEvent(new CustomEvent("message", {
+        detail: {
+          stdin: this.encode(JSON.stringify({
+            resync: true,
+          }) + "\n"),
+        },
+      }));
+      return;
+    }
+    this.viewerElement.classList.add("show");
+    this.errorElement.classList.remove("show");
+    this.contents = this.contents.slice(0, patch.from) + patch.text + this.contents.slice(patch.to);
+    this.version = patch.version;
+    this.editor.replaceRange(patch.text, this.editor.posFromIndex(patch.from), this.editor.posFromIndex(patch.to));
+  }
+
   handleMessage(message) {
     if (message.type != "output") {
       console.warn("Message type not implemented:", message);
@@ -81,11 +105,13 @@ class TextViewerWidget extends Widget {
       return;
     }
 
-    this.stdoutBuffer += this.atob(message.stdout);
+    this.stdoutBuffer += this.decode(message.stdout, "stdout");
     for (let newlinePosition = this.stdoutBuffer.indexOf("\n"); newlinePosition != -1; newlinePosition = this.stdoutBuffer.indexOf("\n")) {
       const stdoutMessage = JSON.parse(this.stdoutBuffer.slice(0, newlinePosition));
       if ("contents" in stdoutMessage) {
-        this.setupContents(stdoutMessage.contents);
+        this.setupContents(stdoutMessage.contents, "version" in stdoutMessage ? stdoutMessage.version : null);
+      } else if ("base" in stdoutMessage) {
+        this.applyPatch(stdoutMessage);
       } else if ("error" in stdoutMessage) {
         this.setupError(stdoutMessage.error);
       }
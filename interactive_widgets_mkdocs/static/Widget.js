@@ -1,10 +1,56 @@
 class Widget extends EventTarget {
+  constructor() {
+    super();
+    this.decoders = new Map();
+  }
+
+  decode(bytes, stream = null) {
+    if (stream === null) {
+      return new TextDecoder().decode(bytes);
+    }
+    if (!this.decoders.has(stream)) {
+      this.decoders.set(stream, new TextDecoder());
+    }
+    return this.decoders.get(stream).decode(bytes, { stream: true });
+  }
+
+  resetDecoders() {
+    this.decoders.clear();
+  }
+
+  diffText(before, after) {
+    let from = 0;
+    const maxLength = Math.min(before.length, after.length);
+    while (from < maxLength && before.charCodeAt(from) === after.charCodeAt(from)) {
+      from++;
+    }
+    if (from > 0 && from < maxLength && this.isHighSurrogate(before.charCodeAt(from - 1))) {
+      from--;
+    }
+    let suffix = 0;
+    while (suffix < maxLength - from && before.charCodeAt(before.length - suffix - 1) === after.charCodeAt(after.length - suffix - 1)) {
+      suffix++;
+    }
+    if (suffix > 0 && this.isHighSurrogate(before.charCodeAt(before.length - suffix - 1))) {
+      suffix--;
+    }
+    return {
+      from: from,
+      to: before.length - suffix,
+      text: after.slice(from, after.length - suffix),
+    };
+  }
+
+  isHighSurrogate(charCode) {
+    return charCode >= 0xd800 && charCode <= 0xdbff;
+  }
+
+  encode(str) {
+    return new TextEncoder().encode(str);
+  }
+
   atob(str) {
-    // Taken from: https://stackoverflow.com/a/30106551
-    // Going backwards: from bytestream, to percent-encoding, to original string.
-    return decodeURIComponent(atob(str).split('').map(function (c) {
-      return '%' + ('00' + c.charCodeAt(0).toString(16)).slice(-2);
-    }).join(''));
+    return new TextDecoder().decode(Uint8Array.from(atob(str), c => c.charCodeAt(0)));
   }
 
   btoa(str) {
@@ -0,0 +1,134 @@
+import fcntl
+import hashlib
+import json
+import os
+import pathlib
+import shutil
+import typing
+
+
+FICLONE = 0x40049409
+
+
+class StaticFileSync:
+
+    def __init__(self, manifest_path: pathlib.Path, link: str):
+        self.manifest_path = manifest_path
+        self.link = link
+        self.copied_files = 0
+        self.copied_bytes = 0
+        self.skipped_files = 0
+        self.skipped_bytes = 0
+        self.removed_files = 0
+        self.target_files = []
+
+    def _load_manifest(self, target_directory: pathlib.Path) -> dict:
+        try:
+            with self.manifest_path.open() as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if manifest.get('target_directory') != str(target_directory.resolve()):
+            return {}
+        return manifest.get('files', {})
+
+    def _save_manifest(self, target_directory: pathlib.Path, files: dict):
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        temporary_path = self.manifest_path.with_suffix('.tmp')
+        with temporary_path.open('w') as f:
+            json.dump({
+                'target_directory': str(target_directory.resolve()),
+                'files': files,
+            }, f)
+        temporary_path.replace(self.manifest_path)
+
+    def _hash(self, path: pathlib.Path) -> str:
+        digest = hashlib.sha256()
+        with path.open('rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _expand(self, source: pathlib.Path, target: pathlib.PurePosixPath) -> typing.Iterator[typing.Tuple[pathlib.Path, pathlib.PurePosixPath]]:
+        if source.is_file():
+            yield source, target
+            return
+        for directory, _, files in os.walk(source, followlinks=True):
+            relative_directory = pathlib.Path(directory).relative_to(source)
+            for file in files:
+                yield pathlib.Path(directory) / file, target / relative_directory.as_posix() / file
+
+    def _reflink(self, source: pathlib.Path, target: pathlib.Path):
+        with source.open('rb') as source_file, target.open('wb') as target_file:
+            fcntl.ioctl(target_file.fileno(), FICLONE, source_file.fileno())
+
+    def _copy(self, source: pathlib.Path, target: pathlib.Path):
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if target.exists() or target.is_symlink():
+            target.unlink()
+        if self.link == 'hardlink':
+            try:
+                os.link(source, target)
+                return
+            except OSError:
+                pass
+        elif self.link == 'reflink':
+            try:
+                self._reflink(source, target)
+                shutil.copymode(source, target)
+                return
+            except OSError:
+                if target.exists():
+                    target.unlink()
+        shutil.copy(source, target)
+
+    def sync(self, static_files: typing.Dict[str, pathlib.Path], target_directory: pathlib.Path):
+        previous_files = self._load_manifest(target_directory)
+        files = {}
+        for static_file, source in sorted(static_files.items()):
+            for source_file, target_file in self._expand(source, pathlib.PurePosixPath(static_file)):
+                source_stat = source_file.stat()
+                target = target_directory / target_file
+                previous = previous_files.get(str(target_file))
+                entry = {
+                    'size': source_stat.st_size,
+                    'mtime': source_stat.st_mtime_ns,
+                    'hash': None,
+                }
+                if previous is not None and (previous['size'], previous['mtime']) == (entry['size'], entry['mtime']):
+                    entry['hash'] = previous['hash']
+                else:
+                    entry['hash'] = self._hash(source_file)
+                try:
+                    target_stat = target.stat()
+                except OSError:
+                    target_stat = None
+                if previous is not None and target_stat is not None \
+                        and previous['hash'] == entry['hash'] \
+                        and (previous['target_size'], previous['target_mtime']) == (target_stat.st_size, target_stat.st_mtime_ns):
+                    self.skipped_files += 1
+                    self.skipped_bytes += entry['size']
+                else:
+                    self._copy(source_file, target)
+                    target_stat = target.stat()
+                    self.copied_files += 1
+                    self.copied_bytes += entry['size']
+                entry['target_size'] = target_stat.st_size
+                entry['target_mtime'] = target_stat.st_mtime_ns
+                files[str(target_file)] = entry
+
+        for target_file in previous_files.keys() - files.keys():
+            target = target_directory / target_file
+            if target.is_file():
+                target.unlink()
+                self.removed_files += 1
+            for parent in target.parents:
+                if parent == target_directory:
+                    break
+                try:
+                    parent.rmdir()
+                except OSError:
+                    break
+
+        self._save_manifest(target_directory, files)
+        self.target_files = sorted(files.keys())
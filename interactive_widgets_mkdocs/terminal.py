@@ -13,7 +13,15 @@ class TerminalWidget(Widget):
         super().__init__(config, url, soup, index, tag)
         self.image = self.tag['image']
         self.command = self.tag['command']
+        self.start = self._get_start()
         self.working_directory = self.tag.get('working-directory', None)
+        self.flow_control_high_watermark = self._get_int_attribute(
+            'flow-control-high-watermark', self.config['terminal_flow_control_high_watermark'])
+        self.flow_control_low_watermark = self._get_int_attribute(
+            'flow-control-low-watermark', self.config['terminal_flow_control_low_watermark'])
+        if not 0 <= self.flow_control_low_watermark < self.flow_control_high_watermark:
+            raise mkdocs.exceptions.PluginError(
+                f'flow-control-low-watermark and flow-control-high-watermark of widget {self.index} on page {self.url} must satisfy 0 <= low < high, got low {self.flow_control_low_watermark} and high {self.flow_control_high_watermark}')
         self.memory_limit_bytes = self.tag.get(
             'memory-limit-bytes', self.config['backend_default_memory_limit_bytes'])
         self.cpu_limit = self.tag.get(
@@ -32,45 +40,8 @@ class TerminalWidget(Widget):
     def __str__(self) -> str:
         return f'TerminalWidget(name={repr(self.name)}, image={repr(self.image)}, command={repr(self.command)}, working_directory={repr(self.working_directory)})'
 
-    def get_static_files(self):
-        return [
-            'TerminalWidget.js',
-            'Widget.js',
-            'node_modules/xterm/lib',
-            'node_modules/xterm-addon-fit/lib',
-            'node_modules/xterm/css',
-        ]
-
-    def get_dependencies(self) -> typing.List[bs4.element.Tag]:
-        script_widget = self.soup.new_tag('script')
-        script_widget['src'] = self._relative('/Widget.js')
-
-        script_terminal_widget = self.soup.new_tag('script')
-        script_terminal_widget['src'] = self._relative('/TerminalWidget.js')
-
-        script_xterm = self.soup.new_tag('script')
-        script_xterm['src'] = self._relative(
-            '/node_modules/xterm/lib/xterm.js',
-        )
-
-        script_xterm_fit = self.soup.new_tag('script')
-        script_xterm_fit['src'] = self._relative(
-            '/node_modules/xterm-addon-fit/lib/xterm-addon-fit.js',
-        )
-
-        style_xterm = self.soup.new_tag('link')
-        style_xterm['rel'] = 'stylesheet'
-        style_xterm['href'] = self._relative(
-            '/node_modules/xterm/css/xterm.css',
-        )
-
-        return [
-            script_widget,
-            script_terminal_widget,
-            script_xterm,
-            script_xterm_fit,
-            style_xterm,
-        ]
+    def get_assets(self) -> typing.List[str]:
+        return ['TerminalWidget.js']
 
     def get_replacement(self) -> bs4.element.Tag:
         div = self.soup.new_tag('div')
@@ -78,30 +49,13 @@ class TerminalWidget(Widget):
         div['class'] = 'interactive-widgets-container'
         return div
 
-    def get_instantiation(self) -> bs4.element.Tag:
-        script = self.soup.new_tag('script')
-        script.append(f'''
-            {{
-                roomConnection.addWidget();
-                const widget = new TerminalWidget(
-                    document.getElementById("widget-terminal-{self.name}"),
-                    "{self._sanitize_javascript(self.command)}",
-                    "{self._sanitize_javascript(self.working_directory)}",
-                );
-                widget.addEventListener("ready", function _listener() {{
-                    roomConnection.markWidgetReady();
-                    widget.removeEventListener("ready", _listener);
-                }});
-                widget.addEventListener("message", event => {{
-                    roomConnection.sendMessage("{self.name}", event.detail);
-                }});
-                roomConnection.addEventListener("{self.name}", event => {{
-                    widget.handleMessage(event.detail);
-                }});
-                widget.start();
-            }}
-        ''')
-        return script
+    def get_manifest_entry(self) -> dict:
+        return self._get_manifest_entry(f'widget-terminal-{self.name}', [
+            self.command,
+            self.working_directory,
+            self.flow_control_high_watermark,
+            self.flow_control_low_watermark,
+        ])
 
     def get_backend_configuration(self) -> dict:
         configuration = {
@@ -116,4 +70,6 @@ class TerminalWidget(Widget):
         }
         if self.working_directory is not None:
             configuration['working_directory'] = self.working_directory
+        if self.start == 'on-demand':
+            configuration['start'] = 'on-demand'
         return configuration
@@ -3,10 +3,11 @@ import mkdocs
 import pathlib
 import typing
 
-from .widget import Widget
+from .assets import get_codemirror_mode_files
+from .monitor import MonitorWidget
 
 
-class TextViewerWidget(Widget):
+class TextViewerWidget(MonitorWidget):
 
     def __init__(self, config: mkdocs.config.base.Config, url: pathlib.PurePosixPath, soup: bs4.BeautifulSoup, index: int, tag: bs4.element.Tag):
         super().__init__(config, url, soup, index, tag)
@@ -38,48 +39,11 @@ class TextViewerWidget(Widget):
     def __str__(self) -> str:
         return f'TextViewerWidget(name={repr(self.name)}, file={repr(self.file)})'
 
-    def get_static_files(self):
-        return [
-            'TextViewerWidget.js',
-            'Widget.js',
-            'node_modules/codemirror/addon',
-            'node_modules/codemirror/keymap',
-            'node_modules/codemirror/lib',
-            'node_modules/codemirror/mode',
-            'node_modules/codemirror/theme',
-        ]
-
-    def get_dependencies(self) -> typing.List[bs4.element.Tag]:
-        script_widget = self.soup.new_tag('script')
-        script_widget['src'] = self._relative('/TextViewerWidget.js')
-
-        script_text_viewer_widget = self.soup.new_tag('script')
-        script_text_viewer_widget['src'] = self._relative('/TextViewerWidget.js')
-
-        script_codemirror = self.soup.new_tag('script')
-        script_codemirror['src'] = self._relative(
-            '/node_modules/codemirror/lib/codemirror.js',
-        )
-
-        style_codemirror = self.soup.new_tag('link')
-        style_codemirror['rel'] = 'stylesheet'
-        style_codemirror['href'] = self._relative(
-            '/node_modules/codemirror/lib/codemirror.css',
-        )
-
-        script_codemirror_mode = []
+    def get_assets(self) -> typing.List[str]:
+        assets = ['TextViewerWidget.js']
         if self.mode is not None:
-            script_codemirror_mode.append(self.soup.new_tag('script'))
-            script_codemirror_mode[0]['src'] = self._relative(
-                f'/node_modules/codemirror/mode/{self.mode}/{self.mode}.js',
-            )
-
-        return [
-            script_widget,
-            script_text_viewer_widget,
-            script_codemirror,
-            style_codemirror,
-        ] + script_codemirror_mode
+            assets += get_codemirror_mode_files(self.mode)
+        return assets
 
     def get_replacement(self) -> bs4.element.Tag:
         div = self.soup.new_tag('div')
@@ -87,41 +51,18 @@ class TextViewerWidget(Widget):
         div['class'] = 'interactive-widgets-container'
         return div
 
-    def get_instantiation(self) -> bs4.element.Tag:
-        script = self.soup.new_tag('script')
-        mode_parameter = f'"{self._sanitize_javascript(self.mode)}"' if self.mode is not None else 'null'
-        script.append(f'''
-            {{
-                roomConnection.addWidget();
-                const widget = new TextViewerWidget(
-                    document.getElementById("widget-text-viewer-{self.name}"),
-                    "{self._sanitize_javascript(self.file)}",
-                    {mode_parameter},
-                );
-                widget.addEventListener("ready", function _listener() {{
-                    roomConnection.markWidgetReady();
-                    widget.removeEventListener("ready", _listener);
-                }});
-                roomConnection.addEventListener("{self.name}", event => {{
-                    widget.handleMessage(event.detail);
-                }});
-                widget.start();
-            }}
-        ''')
-        return script
+    def get_manifest_entry(self) -> dict:
+        return self._get_manifest_entry(f'widget-text-viewer-{self.name}', [
+            self.file,
+            self.mode,
+        ])
 
-    def get_backend_configuration(self) -> dict:
-        return {
-            'type': 'always',
-            'logger_name': f'{self.config["backend_type"].capitalize()}Always',
-            'image': self.config['backend_monitor_image'],
-            'command': [
-                self.config['backend_monitor_command'],
-                self.file,
-                self.success_timeout,
-                self.failure_timeout,
-            ],
-            'memory_limit_bytes': self.memory_limit_bytes,
-            'cpu_limit': self.cpu_limit,
-            'pids_limit': self.pids_limit,
-        }
+    def get_monitor_arguments(self) -> typing.List[str]:
+        arguments = [
+            self.file,
+            self.success_timeout,
+            self.failure_timeout,
+        ]
+        if self.config['monitor_protocol'] == 'delta':
+            arguments.append('delta')
+        return arguments
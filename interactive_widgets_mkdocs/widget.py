@@ -1,13 +1,16 @@
 import binascii
 import bs4
 import hashlib
+import json
 import mkdocs
 import os
 import pathlib
-import re
 import typing
 
 
+WIDGET_STARTS = ['eager', 'on-demand']
+
+
 class Widget:
 
     def __init__(self, config: mkdocs.config.base.Config, url: pathlib.PurePosixPath, soup: bs4.BeautifulSoup, index: int, tag: bs4.element.Tag):
@@ -17,6 +20,8 @@ class Widget:
         self.soup = soup
         self.index = index
         self.tag = tag
+        self.room_scope = None
+        self.start = 'eager'
 
     def _hash_inputs(self, *args) -> str:
         return hashlib.sha256(b'-'.join([
@@ -24,8 +29,47 @@ class Widget:
             for arg in args
         ])).hexdigest()
 
-    def _sanitize_javascript(self, data: str) -> str:
-        return re.sub(r'[^0-9a-zA-Z\.\-]', lambda match: f'\\u{{{hex(ord(match.group(0)))[2:]}}}', data)
+    def get_scoped_executor(self) -> str:
+        return json.dumps([type(self).__name__, self.get_backend_configuration()], sort_keys=True)
+
+    def set_room_scope(self, room_scope: str, occurrence: int):
+        self.room_scope = room_scope
+        self.name = self._hash_inputs(
+            room_scope,
+            self.get_scoped_executor(),
+            str(occurrence),
+        )
+
+    def _get_int_attribute(self, attribute: str, default: int) -> int:
+        value = self.tag.get(attribute, default)
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            raise mkdocs.exceptions.PluginError(
+                f'{attribute} of widget {self.index} on page {self.url} must be an integer, got {value!r}')
+
+    def _get_max_output_lines(self) -> int:
+        max_output_lines = self._get_int_attribute(
+            'max-output-lines', self.config['output_log_max_lines'])
+        if max_output_lines < 1:
+            raise mkdocs.exceptions.PluginError(
+                f'max-output-lines of widget {self.index} on page {self.url} must be at least 1, got {max_output_lines}')
+        return max_output_lines
+
+    def _get_start(self) -> str:
+        start = self.tag.get('start', self.config['widget_default_start'])
+        if start not in WIDGET_STARTS:
+            raise mkdocs.exceptions.PluginError(
+                f'start of widget {self.index} on page {self.url} must be one of {", ".join(WIDGET_STARTS)}, got {start}')
+        return start
 
-    def _relative(self, file: pathlib.PurePosixPath) -> pathlib.PurePosixPath:
-        return pathlib.PurePosixPath(os.path.relpath(file, self.url))
+    def _get_manifest_entry(self, element_id: str, parameters: list) -> dict:
+        entry = {
+            'type': type(self).__name__,
+            'name': self.name,
+            'element': element_id,
+            'parameters': parameters,
+        }
+        if self.start == 'on-demand':
+            entry['start'] = 'on-demand'
+        return entry
@@ -1,6 +1,10 @@
+import re
 import setuptools
 import setuptools.command.build_py
 
+with open('interactive_widgets_mkdocs/__init__.py') as f:
+    version = re.search(r"__version__ = '(.*)'", f.read()).group(1)
+
 
 class NpmInstall(setuptools.command.build_py.build_py):
 
@@ -11,12 +15,21 @@ class NpmInstall(setuptools.command.build_py.build_py):
 
 setuptools.setup(
     name='interactive_widgets_mkdocs',
-    version='0.0.1',
+    version=version,
     packages=setuptools.find_packages(),
     install_requires=[
         'beautifulsoup4>=4.9.3',
         'mkdocs>=1.1.2',
     ],
+    extras_require={
+        'brotli': [
+            'brotli',
+        ],
+        'minify': [
+            'rcssmin',
+            'rjsmin',
+        ],
+    },
     entry_points={
         'mkdocs.plugins': [
             'interactive_widgets = interactive_widgets_mkdocs.plugin:Plugin',
@@ -0,0 +1,146 @@
+import json
+import pathlib
+import types
+
+import mkdocs.config.config_options
+import mkdocs.plugins
+import mkdocs.structure.pages
+import pytest
+
+from interactive_widgets_mkdocs import rewriter
+from interactive_widgets_mkdocs import shard
+from interactive_widgets_mkdocs.plugin import Plugin
+
+
+PAGES_DIRECTORY = pathlib.Path(__file__).parent / 'pages'
+PAGE_URLS = ['widgets/', 'section/widgets/']
+
+CONFIGS = [
+    {},
+    {'room_scope': 'site'},
+    {'room_scope': 'section'},
+    {'monitor_multiplex': True},
+    {'widget_default_start': 'on-demand'},
+    {'script_loading': 'blocking', 'script_preload': True},
+    {'websocket_binary_protocol': True},
+]
+
+
+class Page:
+
+    def __init__(self, url: str, abs_dest_path: pathlib.Path):
+        self.url = url
+        self.file = types.SimpleNamespace(abs_dest_path=str(abs_dest_path))
+        self.meta = {}
+
+    def __str__(self) -> str:
+        return f'Page(url={self.url!r})'
+
+
+def get_page_output() -> str:
+    return (PAGES_DIRECTORY / 'widgets.html').read_text()
+
+
+def get_plugin(tmp_path: pathlib.Path, config: dict) -> Plugin:
+    plugin = Plugin()
+    errors, warnings = plugin.load_config(config)
+    assert errors == []
+    mkdocs_config = plugin.on_config({
+        'site_dir': str(tmp_path / 'site'),
+        'config_file_path': str(tmp_path / 'mkdocs.yml'),
+    })
+    plugin.on_pre_build(config=mkdocs_config)
+    return plugin
+
+
+def build(tmp_path: pathlib.Path, config: dict) -> dict:
+    plugin = get_plugin(tmp_path, config)
+    outputs = {}
+    for page_url in PAGE_URLS:
+        page = Page(page_url, tmp_path / 'site' / page_url / 'index.html')
+        outputs[page_url] = plugin.on_post_page(get_page_output(), page=page)
+        pathlib.Path(page.file.abs_dest_path).parent.mkdir(parents=True, exist_ok=True)
+        pathlib.Path(page.file.abs_dest_path).write_text(outputs[page_url])
+    if len(plugin.pending_pages) > 0:
+        pending_pages = plugin.pending_pages
+        plugin._rewrite_pending_pages()
+        for page, _, _ in pending_pages:
+            outputs[page.url] = pathlib.Path(
+                page.file.abs_dest_path).read_text()
+    return {
+        'outputs': outputs,
+        'backend_configuration': plugin.backend_configuration,
+        'static_files': sorted(plugin.static_files),
+        'bundles': plugin.bundles,
+        'cache_hits': plugin.cache.hits if plugin.cache is not None else 0,
+    }
+
+
+def without_cache_hits(result: dict) -> dict:
+    return {key: value for key, value in result.items() if key != 'cache_hits'}
+
+
+@pytest.mark.parametrize('config', CONFIGS)
+@pytest.mark.parametrize('page_url', PAGE_URLS)
+def test_splice_matches_soup(config, page_url):
+    plugin = Plugin()
+    plugin.load_config(config)
+    page_rewriter = rewriter.PageRewriter(dict(plugin.config))
+    entry = page_rewriter.rewrite(get_page_output(), page_url, page_url)
+
+    page_configuration = page_rewriter._get_page_configuration()
+    if plugin.config['room_scope'] != 'page':
+        page_configuration['room_scope'] = page_rewriter._get_room_scope(
+            page_url)
+    static_files = set()
+    bundles = {}
+    output = page_rewriter._rewrite_soup(
+        get_page_output(), page_url, page_configuration, static_files, bundles)
+
+    assert entry['output'] == output
+    assert entry['page'] == page_configuration
+    assert entry['static_files'] == sorted(static_files)
+    assert entry['bundles'] == bundles
+
+
+@pytest.mark.parametrize('config', CONFIGS)
+def test_cached_matches_uncached(tmp_path, config):
+    uncached = build(tmp_path / 'uncached', dict(config, cache=False))
+    first = build(tmp_path / 'cached', config)
+    second = build(tmp_path / 'cached', config)
+
+    assert first['cache_hits'] == 0
+    assert second['cache_hits'] == len(PAGE_URLS)
+    assert without_cache_hits(first) == without_cache_hits(uncached)
+    assert without_cache_hits(second) == without_cache_hits(uncached)
+
+
+@pytest.mark.parametrize('config', CONFIGS)
+def test_parallel_matches_serial(tmp_path, config):
+    serial = build(tmp_path / 'serial', dict(config, cache=False))
+    parallel = build(tmp_path / 'parallel', dict(
+        config, cache=False, parallel_rewrite=True, parallel_rewrite_processes=2))
+
+    assert parallel == serial
+
+
+@pytest.mark.parametrize('config', CONFIGS)
+def test_shards_match_backend_configuration(tmp_path, config):
+    backend_configuration = build(
+        tmp_path, dict(config, cache=False))['backend_configuration']
+    shard.ShardWriter(tmp_path / 'shards').write(backend_configuration)
+
+    index = json.loads((tmp_path / 'shards' / 'index.json').read_text())
+    pages = {}
+    for page_url, page_shard in index['pages'].items():
+        page = json.loads((tmp_path / 'shards' / page_shard).read_text())
+        page['executors'] = {
+            name: json.loads((tmp_path / 'shards' / executor_shard).read_text())
+            for name, executor_shard in page['executors'].items()
+        }
+        pages[page_url] = page
+
+    assert dict(index, pages=pages) == backend_configuration
+    for page_url, page in pages.items():
+        assert list(page['executors']) == list(
+            backend_configuration['pages'][page_url]['executors'])